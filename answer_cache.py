@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Answer Cache
+Disk-backed cache of source answers in SQLite (WAL mode), shared by every
+bot process on the machine. Entries are keyed by source and normalized
+question, expire after a per-source TTL, "no results" answers are cached
+for a shorter time, and the table is kept under a fixed number of rows.
+
+Inspect or empty it:
+    python answer_cache.py stats
+    python answer_cache.py clear
+"""
+
+import functools
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from response_cache import normalize
+from source_runner import is_acceptable
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, '.answer_cache.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    source  TEXT NOT NULL,
+    query   TEXT NOT NULL,
+    answer  TEXT,
+    expires REAL NOT NULL,
+    PRIMARY KEY (source, query)
+);
+CREATE INDEX IF NOT EXISTS answers_expires ON answers (expires);
+"""
+
+MISS = object()
+
+
+class AnswerCache:
+    # Puts between checks of the row count
+    EVICT_EVERY = 64
+
+    def __init__(self, namespace, ttls=None, default_ttl=3600, negative_ttl=300,
+                 max_entries=5000, path=CACHE_PATH):
+        """
+        namespace:    prefix for this bot's sources - bots format answers differently
+        ttls:         {source name: seconds}; 0 means never cache that source
+        negative_ttl: seconds a "no results" answer is remembered (capped by the source TTL)
+        max_entries:  rows kept before the ones closest to expiry are evicted
+        """
+        self.namespace = namespace
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def connection(self):
+        """One connection per thread; WAL lets readers and a writer from any process overlap"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self.local.conn = conn
+        return conn
+
+    def ttl_for(self, source):
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, source, query):
+        """Return the cached answer (None for a cached "no results") or MISS"""
+        try:
+            row = self.connection().execute(
+                'SELECT answer FROM answers WHERE source = ? AND query = ? AND expires > ?',
+                (f"{self.namespace}/{source}", normalize(query), time.time())).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        with self.lock:
+            if row is None:
+                self.misses += 1
+                return MISS
+            self.hits += 1
+        return row[0]
+
+    def put(self, source, query, answer):
+        """Cache `answer` for `query`; None records that the source had nothing"""
+        ttl = self.ttl_for(source)
+        if answer is None:
+            ttl = min(ttl, self.negative_ttl)
+        if not ttl or ttl <= 0:
+            return
+
+        try:
+            conn = self.connection()
+            conn.execute('INSERT OR REPLACE INTO answers (source, query, answer, expires) VALUES (?, ?, ?, ?)',
+                         (f"{self.namespace}/{source}", normalize(query), answer, time.time() + ttl))
+            with self.lock:
+                self.puts += 1
+                due = self.puts % self.EVICT_EVERY == 0
+            if due:
+                self.evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def evict(self, conn=None):
+        """Drop expired rows, then the rows closest to expiry until under max_entries"""
+        conn = conn or self.connection()
+        conn.execute('DELETE FROM answers WHERE expires <= ?', (time.time(),))
+        (count,) = conn.execute('SELECT COUNT(*) FROM answers').fetchone()
+        if count > self.max_entries:
+            conn.execute('DELETE FROM answers WHERE rowid IN '
+                         '(SELECT rowid FROM answers ORDER BY expires LIMIT ?)', (count - self.max_entries,))
+
+    def clear(self):
+        self.connection().execute('DELETE FROM answers')
+
+    def report(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            rate = self.hits / lookups if lookups else 0.0
+            return f"Answer cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate)"
+
+
+def cached_source(source):
+    """
+    Decorator for a bot's search_*(query, ...) method: answers come from
+    self.answer_cache when present, and fresh results are stored under
+    `source`. A None result is only cached when no call failed or was
+    refused by self.breakers during the lookup, so an outage is never
+    remembered as "no results". With a self.flight (SingleFlight), callers
+    asking the same question at the same time share one upstream lookup;
+    a caller passing timeout= waits for another caller's lookup no longer
+    than that before running its own, and coalesce=False (a hedged
+    duplicate) always runs its own. With a self.source_stats (SourceStats),
+    the latency and outcome of every call that really went upstream is
+    recorded - cache hits and shared lookups say nothing about the source.
+    """
+    def decorator(method):
+        def fetch(self, query, *args, **kwargs):
+            stats = getattr(self, 'source_stats', None)
+            start = time.perf_counter()
+            answer = None
+            try:
+                answer = method(self, query, *args, **kwargs)
+                return answer
+            finally:
+                if stats is not None:
+                    stats.record(source, time.perf_counter() - start, is_acceptable(answer))
+
+        @functools.wraps(method)
+        def wrapper(self, query, *args, **kwargs):
+            coalesce = kwargs.pop('coalesce', True)
+            cache = getattr(self, 'answer_cache', None)
+            if cache is None:
+                return fetch(self, query, *args, **kwargs)
+
+            answer = cache.get(source, query)
+            if answer is not MISS:
+                print(f"  💾 {source}: cached")
+                return answer
+
+            def lookup():
+                breakers = getattr(self, 'breakers', None)
+                failures = breakers.unavailable_count() if breakers else 0
+                answer = fetch(self, query, *args, **kwargs)
+                if answer is not None or breakers is None or breakers.unavailable_count() == failures:
+                    cache.put(source, query, answer)
+                return answer
+
+            flight = getattr(self, 'flight', None)
+            if flight is None or not coalesce:
+                return lookup()
+            answer, shared = flight.do((cache.namespace, source, normalize(query)), lookup,
+                                       timeout=kwargs.get('timeout'))
+            if shared:
+                print(f"  🔗 {source}: shared an in-flight lookup")
+            return answer
+        return wrapper
+    return decorator
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'stats'
+    cache = AnswerCache('cli')
+    conn = cache.connection()
+    if command == 'clear':
+        cache.clear()
+        print("✓ Answer cache cleared")
+    elif command == 'stats':
+        now = time.time()
+        rows = conn.execute('SELECT source, COUNT(*), SUM(answer IS NULL), SUM(expires <= ?) '
+                            'FROM answers GROUP BY source ORDER BY source', (now,)).fetchall()
+        for source, count, negative, expired in rows:
+            print(f"{source}: {count} entries ({negative} no-result, {expired} expired)")
+        if not rows:
+            print("Answer cache is empty")
+    else:
+        print(__doc__)
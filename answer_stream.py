@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Answer Stream
+Single-pass, incremental answer cleanup: text is fed in as it arrives and
+comes out as clean, whole sentences - citations like [3] dropped, HTML
+entities decoded, whitespace collapsed and the answer cut at a word
+boundary once it reaches its length limit. Display and speech can start
+on the first sentence while the rest is still being fetched or cleaned.
+"""
+
+import html
+import queue
+import re
+import threading
+
+# One token per match: a citation, an entity, a whitespace run, a word, or a lone '[' / '&'
+TOKEN_RE = re.compile(r'\[\d+\]|&(?:#\d+|#[xX][0-9a-fA-F]+|[a-zA-Z]+\d*);|\s+|[^\s\[&]+|[\[&]')
+# A citation or entity that may still be completed by the next piece of text
+PARTIAL_RE = re.compile(r'(?:\[\d*|&#?[xX]?\w*)$')
+# End of a sentence: terminal punctuation, closing quotes, a space, then a capital or digit
+SENTENCE_END_RE = re.compile(r'[.!?]+["\')\]]* (?=["\'(\[]?[A-Z0-9])')
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'e.g', 'i.e', 'u.s', 'u.k', 'no', 'approx'}
+
+
+class AnswerNormalizer:
+    """Feed answer text in pieces; get clean sentences back as soon as each is complete"""
+
+    def __init__(self, limit=1500, ellipsis='...'):
+        """
+        limit:    characters the whole answer may take; the sentence that
+                  crosses it is cut at a word boundary and ends in `ellipsis`
+        """
+        self.limit = limit
+        self.ellipsis = ellipsis
+        self.pending = ''   # Raw text whose last token may be incomplete
+        self.clean = ''     # Cleaned text not yet split off as a sentence
+        self.emitted = 0
+        self.done = False
+
+    def feed(self, text):
+        """Add raw text; return the sentences it completed"""
+        if self.done:
+            return []
+        self.pending += text
+        cut = len(self.pending)
+        last = None
+        for last in TOKEN_RE.finditer(self.pending):
+            pass
+        if last is not None:
+            # The last token can still grow - a word, a run of spaces, a citation
+            cut = last.start()
+        partial = PARTIAL_RE.search(self.pending)
+        if partial:
+            cut = min(cut, partial.start())
+        self._clean(self.pending[:cut])
+        self.pending = self.pending[cut:]
+        return self._sentences()
+
+    def finish(self):
+        """Flush whatever is left once the answer is complete"""
+        if self.done:
+            return []
+        self._clean(self.pending)
+        self.pending = ''
+        sentences = self._sentences()
+        rest = self.clean.strip()
+        self.clean = ''
+        if rest and not self.done:
+            sentences.extend(self._emit(rest))
+        self.done = True
+        return sentences
+
+    def _clean(self, text):
+        parts = [self.clean]
+        ends_with_space = not self.clean or self.clean.endswith(' ')
+        for match in TOKEN_RE.finditer(text):
+            token = match.group()
+            first = token[0]
+            if first == '[' and len(token) > 1:
+                continue
+            if first == '&' and len(token) > 1:
+                token = html.unescape(token).replace('\xa0', ' ')
+                if token.isspace():
+                    token = ' '
+            if token.isspace():
+                if ends_with_space:
+                    continue
+                token = ' '
+            parts.append(token)
+            ends_with_space = token == ' '
+        self.clean = ''.join(parts)
+
+    def _sentences(self):
+        sentences = []
+        start = 0
+        for match in SENTENCE_END_RE.finditer(self.clean):
+            words = self.clean[start:match.start()].rsplit(' ', 1)
+            if words[-1].lower() in ABBREVIATIONS:
+                continue
+            sentences.extend(self._emit(self.clean[start:match.end()].strip()))
+            start = match.end()
+            if self.done:
+                break
+        self.clean = '' if self.done else self.clean[start:]
+        return sentences
+
+    def _emit(self, sentence):
+        if not sentence:
+            return []
+        room = self.limit - self.emitted - (1 if self.emitted else 0)
+        if len(sentence) > room:
+            # Cut at the last word boundary that fits and stop taking text
+            cut = sentence.rfind(' ', 0, max(room, 0) + 1)
+            sentence = sentence[:cut].rstrip(' ,;:') if cut > 0 else sentence[:max(room, 0)]
+            self.done = True
+            if not sentence:
+                return []
+            sentence += self.ellipsis
+        self.emitted += len(sentence) + (1 if self.emitted else 0)
+        return [sentence]
+
+
+def normalize_stream(pieces, limit=1500):
+    """Yield clean sentences from an iterable of raw answer pieces"""
+    normalizer = AnswerNormalizer(limit=limit)
+    for piece in pieces:
+        yield from normalizer.feed(piece)
+        if normalizer.done:
+            return
+    yield from normalizer.finish()
+
+
+def normalize_answer(text, limit=1500):
+    """The whole answer cleaned in one pass"""
+    return ' '.join(normalize_stream([text], limit=limit))
+
+
+class SpeechQueue:
+    """
+    Speaks text in order on a background thread. The first sentence goes
+    to the synthesizer at once; sentences that arrive while it is talking
+    are joined and spoken in one go, so there is one synthesizer start per
+    batch instead of per sentence.
+    """
+
+    def __init__(self, speak, max_chars=800):
+        """
+        speak:     callable that speaks a string and returns when done
+        max_chars: characters spoken per answer at most
+        """
+        self.speak = speak
+        self.max_chars = max_chars
+        self.queue = queue.Queue()
+        self.budget = max_chars
+        self.lock = threading.Lock()
+        threading.Thread(target=self._run, name='speech', daemon=True).start()
+
+    def start(self):
+        """Begin a new answer - resets the per-answer character budget"""
+        with self.lock:
+            self.budget = self.max_chars
+
+    def say(self, text):
+        with self.lock:
+            if self.budget <= 0:
+                return
+            text = text[:self.budget]
+            self.budget -= len(text) + 1
+        self.queue.put(text)
+
+    def wait(self):
+        """Block until everything queued so far has been spoken"""
+        self.queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.speak(' '.join(batch))
+            except Exception:
+                pass
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
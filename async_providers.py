@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Async Providers
+The online lookups as asyncio coroutines on one event loop and one
+aiohttp session per process. A bot hands each turn's fan-out to the
+shared ProviderLoop: the first acceptable answer wins, the lookups still
+running are cancelled mid-request, and Ctrl+C cancels the whole turn.
+Every request still goes through the bot's circuit breakers, the shared
+per-upstream rate limiter and the answer cache, and identical lookups in
+flight on the loop share one request.
+
+    python async_providers.py "q1" "q2" ...   # resolve questions concurrently
+"""
+
+import abc
+import asyncio
+import atexit
+import json
+import threading
+import time
+from urllib.parse import quote
+
+from answer_cache import MISS
+from circuit_breaker import CircuitOpenError
+from extractors import get_extractor
+from http_session import USER_AGENT
+from rate_limit import RateLimited, shared_limiter
+from response_cache import normalize
+from source_runner import is_acceptable
+from wiki_client import API_URL, best_page, search_params
+
+
+def _aiohttp():
+    """aiohttp, imported on first use - it is slow to import and only lookups need it"""
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("aiohttp is required for async lookups (pip install aiohttp)") from None
+    return aiohttp
+
+
+class ProviderLoop:
+    """The process-wide event loop, on its own thread, that every provider lookup runs on"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        _aiohttp()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='provider-loop', daemon=True)
+        self.thread.start()
+        self._session = None
+        # Only touched on the loop: key -> [task, callers waiting on it]
+        self.flights = {}
+        self.stats = {'fetched': 0, 'shared': 0, 'cancelled': 0}
+
+    @classmethod
+    def shared(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.close)
+            return cls._instance
+
+    @classmethod
+    def started(cls):
+        """The shared loop if a lookup has started it, else None"""
+        return cls._instance
+
+    async def session(self):
+        """The shared aiohttp session - created on, and only usable from, this loop"""
+        if asyncio.get_running_loop() is not self.loop:
+            raise RuntimeError("The provider session belongs to ProviderLoop.loop - use ProviderLoop.run()")
+        if self._session is None or self._session.closed:
+            self._session = _aiohttp().ClientSession(headers={'User-Agent': USER_AGENT})
+        return self._session
+
+    def run(self, coro, timeout=None):
+        """Run `coro` on the loop and wait for it; Ctrl+C or a timeout here cancels it"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def coalesce(self, key, func, *args):
+        """
+        await func(*args), shared with every caller awaiting the same key
+        meanwhile. Once the last of them stops waiting (each lost its race
+        or its turn was interrupted) the call is cancelled mid-request.
+        """
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = self.flights[key] = [asyncio.ensure_future(func(*args)), 0]
+            self.stats['fetched'] += 1
+
+            def landed(_):
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight[0].add_done_callback(landed)
+        else:
+            self.stats['shared'] += 1
+
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not flight[0].done():
+                flight[0].cancel()
+                self.stats['cancelled'] += 1
+
+    def report(self):
+        stats = dict(self.stats)
+        return (f"Provider loop: {stats['fetched']} upstream lookups, {stats['shared']} shared, "
+                f"{stats['cancelled']} cancelled mid-request")
+
+    def close(self):
+        if not self.loop.is_running():
+            return
+
+        async def close_session():
+            if self._session is not None:
+                await self._session.close()
+        try:
+            self.run(close_session(), timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class ProviderContext:
+    """What one bot's providers go through: its breakers, its answer cache and its latency record"""
+
+    def __init__(self, breakers=None, answer_cache=None, record=None):
+        """
+        breakers:     BreakerBoard guarding the upstreams
+        answer_cache: AnswerCache consulted before, and filled after, each lookup
+        record:       called as record(source name, seconds, answer) after each lookup
+        """
+        self.breakers = breakers
+        self.answer_cache = answer_cache
+        self.record = record
+
+    async def get(self, breaker, url, params=None, headers=None, timeout=5):
+        """
+        GET `url` through the circuit breaker `breaker` and the shared rate
+        limiter and return the body as text. Raises CircuitOpenError,
+        RateLimited, or on network errors and HTTP error statuses.
+        """
+        board = self.breakers
+        if board is not None and not board.allow(breaker):
+            raise CircuitOpenError(breaker)
+        try:
+            # Same per-upstream allowance as the requests session
+            wait = shared_limiter().delay(url, max_wait=timeout)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            session = await ProviderLoop.shared().session()
+            client_timeout = _aiohttp().ClientTimeout(total=timeout)
+            async with session.get(url, params=params, headers=headers, timeout=client_timeout) as response:
+                response.raise_for_status()
+                text = await response.text()
+        except (RateLimited, asyncio.CancelledError):
+            # Our own throttling, or a lookup that lost its race - says nothing about the upstream
+            if board is not None:
+                board[breaker].cancel()
+            raise
+        except Exception:
+            if board is not None:
+                board.record(breaker, False)
+            raise
+        if board is not None:
+            board.record(breaker, True)
+        return text
+
+    async def lookup(self, provider, query):
+        """provider's answer to `query` from the answer cache, else from one
+        upstream lookup shared with every caller on the loop asking the same"""
+        cache = self.answer_cache
+        if cache is None or not provider.cached:
+            return await provider.search(self, query)
+        answer = cache.get(provider.name, query)
+        if answer is not MISS:
+            return answer
+        key = (cache.namespace, provider.name, normalize(query))
+        return await ProviderLoop.shared().coalesce(key, self._fetch, provider, query)
+
+    async def _fetch(self, provider, query):
+        # A failed lookup raises before this, so an outage is never cached as "no results"
+        answer = await provider.search(self, query)
+        self.answer_cache.put(provider.name, query, answer)
+        return answer
+
+
+class Provider(abc.ABC):
+    """One upstream's lookup as a coroutine"""
+
+    # Answer-cache source and latency name
+    name = 'provider'
+    # Circuit breaker name when it differs from `name`
+    breaker = None
+    timeout = 5
+    # False for providers wrapping a source that caches its own answers
+    cached = True
+
+    @property
+    def breaker_name(self):
+        return self.breaker or self.name
+
+    @abc.abstractmethod
+    async def search(self, context, query):
+        """Return an answer string or None; raises when the upstream fails or is refused"""
+
+
+class WebProvider(Provider):
+    """Real-time web answers: Jina Reader's plain-text rendering of a Google results page"""
+
+    name = 'web'
+    breaker = 'jina'
+    url = 'https://r.jina.ai/https://www.google.com/search?q={query}'
+    extractor = get_extractor('jina')
+
+    async def search(self, context, query):
+        text = await context.get(self.breaker_name, self.url.format(query=quote(query)),
+                                 headers={'User-Agent': 'Mozilla/5.0'}, timeout=self.timeout)
+        return self.extractor.from_text(text)
+
+
+class WikipediaProvider(Provider):
+    """Search hit and intro extract in one MediaWiki API request"""
+
+    name = 'wikipedia'
+    url = API_URL
+
+    def __init__(self, sentences=5):
+        self.sentences = sentences
+
+    async def search(self, context, query):
+        text = await context.get(self.breaker_name, self.url, params=search_params(query, sentences=self.sentences),
+                                 timeout=self.timeout)
+        page = best_page(json.loads(text))
+        return page.extract if page else None
+
+
+class DuckDuckGoProvider(Provider):
+    """Instant answers and definitions"""
+
+    name = 'duckduckgo'
+    url = 'https://api.duckduckgo.com/'
+    extractor = get_extractor('duckduckgo')
+
+    async def search(self, context, query):
+        params = {'q': query, 'format': 'json', 'no_redirect': 1}
+        text = await context.get(self.breaker_name, self.url, params=params, timeout=self.timeout)
+        return self.extractor.from_text(text)
+
+
+class ThreadProvider(Provider):
+    """
+    A blocking source method run on a thread pool - for sources with their
+    own caching and breakers and no async client (the weather client's
+    cached two-step lookup). Cancelling it stops the wait; the request
+    itself runs on, bounded by its timeout.
+    """
+
+    cached = False
+
+    def __init__(self, name, func, executor=None):
+        self.name = name
+        self.func = func
+        self.executor = executor
+
+    async def search(self, context, query):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.func, query)
+
+
+async def first_answer(providers, context, query, accept=is_acceptable, timeout=None):
+    """
+    Look `query` up with every provider at once and return (name, answer)
+    for the first acceptable answer; the lookups still running are
+    cancelled. Returns (None, None) if nothing acceptable arrives within
+    `timeout` seconds.
+    """
+    async def timed(provider):
+        start = time.perf_counter()
+        try:
+            answer = await context.lookup(provider, query)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            answer = None
+        if context.record is not None:
+            context.record(provider.name, time.perf_counter() - start, answer)
+        return provider.name, answer
+
+    tasks = [asyncio.ensure_future(timed(provider)) for provider in providers]
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=timeout):
+            try:
+                name, answer = await next_done
+            except asyncio.TimeoutError:
+                break
+            if accept(answer):
+                return name, answer
+        return None, None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Resolve every question given on the command line concurrently on the one loop
+    queries = sys.argv[1:] or ["python programming language", "Mount Everest", "speed of light"]
+    providers = [WebProvider(), WikipediaProvider(), DuckDuckGoProvider()]
+    context = ProviderContext()
+    provider_loop = ProviderLoop.shared()
+
+    async def answer_all():
+        return await asyncio.gather(*(first_answer(providers, context, query) for query in queries))
+
+    start = time.perf_counter()
+    results = provider_loop.run(answer_all())
+    elapsed = time.perf_counter() - start
+
+    for query, (name, answer) in zip(queries, results):
+        print(f"❓ {query}\n   [{name or 'no answer'}] {(answer or '')[:200]}\n")
+    print(f"⏱️  {len(queries)} lookups in {elapsed:.2f}s")
+    print(f"⚡ {provider_loop.report()}")
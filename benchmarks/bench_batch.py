@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Batch Classification Benchmark
+Throughput in utterances/second of replaying a transcript through the
+rule engine one call at a time versus the batch and process-pool APIs
+
+Run from the repository root:
+    python -m benchmarks.bench_batch [utterances] [workers]
+"""
+
+import os
+import random
+import sys
+import time
+
+from chatbot_advanced import AdvancedAIChatbot
+
+SAMPLE_UTTERANCES = [
+    "hello there",
+    "what time is it",
+    "what is machine learning",
+    "tell me a joke",
+    "can you explain quantum entanglement to me",
+    "thanks a lot",
+    "what is the best pizza topping in the world",
+    "how does the internet work",
+]
+
+
+def build_transcript(count, seed=7):
+    rng = random.Random(seed)
+    return [rng.choice(SAMPLE_UTTERANCES) for _ in range(count)]
+
+
+def measure(label, func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {count / elapsed:>12,.0f} utterances/s")
+
+
+def run(count=200000, workers=None):
+    workers = workers or os.cpu_count() or 1
+    transcript = build_transcript(count)
+    bot = AdvancedAIChatbot()
+
+    print(f"Replaying {count:,} utterances ({os.cpu_count()} CPUs)\n")
+    measure("get_ai_response loop", lambda: [bot.get_ai_response(text) for text in transcript], count)
+    measure("get_ai_responses", lambda: list(bot.get_ai_responses(transcript)), count)
+    measure(f"get_ai_responses workers={workers}",
+            lambda: list(bot.get_ai_responses(transcript, workers=workers)), count)
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Extractor Benchmark
+Runs every registered extractor over the saved result pages in
+benchmarks/fixtures/extractors and reports, per extractor, its hit rate
+against the recorded answers, the time per page (whole page and streamed
+in chunks the way the bots read it), the bytes a streamed read needs and
+the peak memory allocated while extracting. Exits non-zero if any
+fixture's answer changed, so it doubles as an offline regression check.
+
+Run from the repository root:
+    python -m benchmarks.bench_extractors [repeats]
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+from extractors import get_extractor
+from html_extract import CHUNK_SIZE
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'extractors')
+
+
+class FixtureResponse:
+    """Just enough of requests.Response to stream a saved page"""
+
+    def __init__(self, body):
+        self.body = body
+        self.encoding = 'utf-8'
+        self.read = 0
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        for start in range(0, len(self.body), chunk_size):
+            chunk = self.body[start:start + chunk_size]
+            self.read += len(chunk)
+            yield chunk
+
+    @property
+    def text(self):
+        self.read = len(self.body)
+        return self.body.decode(self.encoding)
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+def load_cases(directory=FIXTURE_DIR):
+    with open(os.path.join(directory, 'expected.json'), 'r', encoding='utf-8') as f:
+        cases = json.load(f)
+    for case in cases:
+        with open(os.path.join(directory, case['fixture']), 'rb') as f:
+            case['body'] = f.read()
+    return cases
+
+
+def time_per_call(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def peak_allocated(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(repeats=200):
+    cases = load_cases()
+    stats = defaultdict(lambda: defaultdict(float))
+    failures = []
+
+    for case in cases:
+        extractor = get_extractor(case['extractor'])
+        text = case['body'].decode('utf-8')
+        expected = case['expected']
+
+        answer = extractor.from_text(text)
+        response = FixtureResponse(case['body'])
+        streamed = extractor.from_response(response)
+        for label, result in (('whole page', answer), ('streamed', streamed)):
+            if result != expected:
+                failures.append(f"{case['fixture']} [{extractor.name}, {label}]: expected {expected!r}, got {result!r}")
+
+        row = stats[extractor.name]
+        row['cases'] += 1
+        row['answers'] += expected is not None
+        row['hits'] += expected is not None and answer == expected
+        row['correct'] += answer == expected and streamed == expected
+        row['whole'] += time_per_call(lambda: extractor.from_text(text), repeats)
+        row['streamed'] += time_per_call(lambda: extractor.from_response(FixtureResponse(case['body'])), repeats)
+        row['bytes'] += len(case['body'])
+        row['read'] += response.read
+        row['peak'] = max(row['peak'], peak_allocated(lambda: extractor.from_response(FixtureResponse(case['body']))))
+
+    print(f"{len(cases)} fixtures, {repeats} runs each\n")
+    print(f"  {'extractor':<14} {'hit rate':>9} {'correct':>8} {'whole µs':>9} {'stream µs':>10} "
+          f"{'read':>6} {'peak KB':>8}")
+    for name, row in sorted(stats.items()):
+        hit_rate = f"{int(row['hits'])}/{int(row['answers'])}"
+        correct = f"{int(row['correct'])}/{int(row['cases'])}"
+        read = row['read'] / row['bytes'] * 100 if row['bytes'] else 0
+        print(f"  {name:<14} {hit_rate:>9} {correct:>8} {row['whole'] / row['cases'] * 1e6:>9.1f} "
+              f"{row['streamed'] / row['cases'] * 1e6:>10.1f} {read:>5.0f}% {row['peak'] / 1024:>8.1f}")
+
+    if failures:
+        print(f"\n{len(failures)} fixture(s) changed:")
+        for failure in failures:
+            print(f"  ✗ {failure}")
+        return 1
+    print("\n✓ Every fixture matches its recorded answer")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(*(int(arg) for arg in sys.argv[1:2])))
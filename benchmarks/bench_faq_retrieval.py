@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+FAQ Retrieval Benchmark
+Builds a synthetic 100k-document TF-IDF index, then measures how long the
+memory-mapped index takes to load and how long top-k queries take
+
+Run from the repository root:
+    python -m benchmarks.bench_faq_retrieval [documents]
+"""
+
+import random
+import sys
+import tempfile
+import time
+
+from faq_retrieval import FaqIndex, build_index
+
+
+def build_documents(count, vocabulary_size=50000, seed=11):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary_size)]
+    documents = []
+    for i in range(count):
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(20, 60)))
+        documents.append((text, f"Answer {i}: {text[:80]}"))
+    return documents
+
+
+def run(count=100000, queries=200):
+    documents = build_documents(count)
+    rng = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        start = time.perf_counter()
+        build_index(documents, index_dir)
+        print(f"build ({count:,} docs, offline)   {time.perf_counter() - start:8.2f}s")
+
+        start = time.perf_counter()
+        index = FaqIndex(index_dir)
+        print(f"load (memory-mapped)          {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+        # Queries reuse a few words from a random document, like a paraphrase
+        samples = []
+        for _ in range(queries):
+            words = rng.choice(documents)[0].split()
+            samples.append(' '.join(rng.sample(words, 4)))
+
+        start = time.perf_counter()
+        for query in samples:
+            index.search(query, k=5)
+        elapsed = (time.perf_counter() - start) / queries
+        print(f"top-5 query                   {elapsed * 1000:8.2f}ms")
+
+        del index
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+HTTP Session Benchmark
+Latency of repeated GETs against a local HTTPS test server with a fresh
+connection per call (module-level requests.get, as the source methods
+used to do) versus the shared pooled session, plus how many TCP/TLS
+handshakes the server saw for each
+
+Run from the repository root:
+    python -m benchmarks.bench_http_session [requests]
+
+Needs the openssl command line tool for the test certificate; without it
+the server falls back to plain HTTP and only TCP handshakes are saved.
+"""
+
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from http_session import make_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with Handler.lock:
+            Handler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        body = json.dumps({'AbstractText': 'A local answer for the benchmark.'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_context(directory):
+    """A server SSL context with a throwaway certificate, or None without openssl"""
+    if shutil.which('openssl') is None:
+        return None
+    cert = os.path.join(directory, 'cert.pem')
+    key = os.path.join(directory, 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                    '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+                   check=True, capture_output=True)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def start_server(context):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    if context is not None:
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = 'https' if context is not None else 'http'
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/search"
+
+
+def measure(label, get, url, count):
+    Handler.connections = 0
+    start = time.perf_counter()
+    for i in range(count):
+        get(url, params={'q': f'question {i}'}, timeout=5, verify=False).json()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / count * 1000:>8.2f} ms/request  {Handler.connections:>5} handshakes")
+    return elapsed
+
+
+def run(count=200):
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+    with tempfile.TemporaryDirectory() as directory:
+        context = self_signed_context(directory)
+        server, url = start_server(context)
+        print(f"{count} GETs against {url.split('/search')[0]}\n")
+
+        fresh = measure("requests.get per call", requests.get, url, count)
+        session = make_session()
+        pooled = measure("shared pooled session", session.get, url, count)
+        print(f"\n  {fresh / pooled:.1f}x faster with connection reuse")
+
+        session.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:2]))
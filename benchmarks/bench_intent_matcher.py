@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Intent Matcher Benchmark
+Compares the old per-pattern re.search loop with the IndexedIntentMatcher
+the intent packs compile into
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_matcher
+"""
+
+import re
+import time
+
+from intent_matcher import IndexedIntentMatcher
+
+
+def build_intents(count):
+    """Build a table shaped like SimpleChatbot.responses with `count` intents"""
+    intents = {}
+    for i in range(count):
+        pattern = rf'\bword{i}\b|\bsay phrase {i}\b'
+        intents[pattern] = [f"Response {i}"]
+    return intents
+
+
+def build_queries(count):
+    """Queries hitting the first, middle and last intent plus a miss"""
+    return [
+        "hello word0 there",
+        f"please say phrase {count // 2} now",
+        f"this mentions word{count - 1} at the end",
+        "nothing in the table matches this sentence at all",
+    ]
+
+
+def loop_lookup(intents, text):
+    """The original SimpleChatbot.get_response strategy"""
+    for pattern, responses in intents.items():
+        if re.search(pattern, text):
+            return responses
+    return None
+
+
+def time_it(func, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(queries))
+
+
+def run(sizes=(10, 1000, 10000)):
+    print(f"{'patterns':>10} {'compile':>10} {'loop/query':>14} {'matcher/query':>15} {'speed-up':>10}")
+    print("-" * 63)
+
+    for size in sizes:
+        intents = build_intents(size)
+        queries = build_queries(size)
+        repeat = max(1, 2000 // size)
+
+        start = time.perf_counter()
+        matcher = IndexedIntentMatcher(intents.items())
+        compile_time = time.perf_counter() - start
+
+        # Both strategies must agree before their timings mean anything
+        for query in queries:
+            assert matcher.lookup(query) == loop_lookup(intents, query), query
+
+        loop_time = time_it(lambda q: loop_lookup(intents, q), queries, repeat)
+        matcher_time = time_it(matcher.lookup, queries, repeat)
+
+        print(f"{size:>10} {compile_time * 1000:>8.1f}ms {loop_time * 1e6:>12.1f}us "
+              f"{matcher_time * 1e6:>13.1f}us {loop_time / matcher_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Knowledge Index Benchmark
+Shows turn latency of the keyword-indexed knowledge base staying flat as
+the number of entries grows, next to the old ordered re.search loop
+
+Run from the repository root:
+    python -m benchmarks.bench_knowledge_index
+"""
+
+import re
+import time
+
+from intent_matcher import IndexedIntentMatcher
+
+
+def build_knowledge_base(count):
+    """Entries shaped like AdvancedAIChatbot.knowledge_base"""
+    knowledge_base = {}
+    for i in range(count):
+        pattern = rf'(what is topic{i}|tell me about topic{i}|explain subject {i})'
+        knowledge_base[pattern] = f"Answer {i}"
+    return knowledge_base
+
+
+def build_queries(count):
+    return [
+        "what is topic0",
+        f"can you tell me about topic{count // 2} please",
+        f"explain subject {count - 1}",
+        "a question the knowledge base knows nothing about",
+    ]
+
+
+def loop_lookup(knowledge_base, text):
+    """The original get_ai_response strategy"""
+    for pattern, response in knowledge_base.items():
+        if re.search(pattern, text):
+            return response
+    return None
+
+
+def time_it(func, queries, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - start) / (repeat * len(queries))
+
+
+def run(sizes=(25, 1000, 10000, 50000)):
+    print(f"{'entries':>10} {'build':>10} {'loop/turn':>12} {'index/turn':>12}")
+    print("-" * 48)
+
+    for size in sizes:
+        knowledge_base = build_knowledge_base(size)
+        queries = build_queries(size)
+
+        start = time.perf_counter()
+        matcher = IndexedIntentMatcher(knowledge_base.items())
+        build_time = time.perf_counter() - start
+
+        for query in queries:
+            assert matcher.lookup(query) == loop_lookup(knowledge_base, query), query
+
+        loop_time = time_it(lambda q: loop_lookup(knowledge_base, q), queries, max(1, 1000 // size))
+        index_time = time_it(matcher.lookup, queries, 200)
+
+        print(f"{size:>10} {build_time:>9.2f}s {loop_time * 1e6:>10.1f}us {index_time * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    run()
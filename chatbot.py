@@ -1,10 +1,11 @@
 import re
-from datetime import datetime
 import speech_recognition as sr
 import pyttsx3
 import threading
 import sys
 import os
+from intent_packs import load_pack
+from response_cache import ResponseCache
 
 class SimpleChatbot:
     def __init__(self):
@@ -27,50 +28,10 @@ class SimpleChatbot:
             self.use_voice = False
         
         self.use_voice = True  # Flag to track if voice is working
-        self.responses = {
-            r'\bhello\b|\bhi\b|\bhey\b': [
-                "Hello! How can I help you today?",
-                "Hi there! What can I do for you?",
-                "Hey! What's on your mind?"
-            ],
-            r'\bhow are you\b|\bhow\'s it going\b': [
-                "I'm doing great! Thanks for asking.",
-                "I'm functioning well, thank you!",
-                "All systems operational! How about you?"
-            ],
-            r'\bwhat\'s your name\b|\bwho are you\b': [
-                f"I'm {self.name}, your personal assistant!",
-                "I'm a simple chatbot here to help you.",
-                "You can call me ChatBot!"
-            ],
-            r'\bwhat time is it\b|\bcurrent time\b': [
-                lambda: f"The current time is {datetime.now().strftime('%H:%M:%S')}",
-                lambda: f"It's {datetime.now().strftime('%I:%M %p')} right now.",
-            ],
-            r'\bwhat\'s the date\b|\btoday\'s date\b': [
-                lambda: f"Today's date is {datetime.now().strftime('%B %d, %Y')}",
-                lambda: f"It's {datetime.now().strftime('%A, %B %d, %Y')}",
-            ],
-            r'\bhelp\b|\bwhat can you do\b|\bcapabilities\b': [
-                "I can answer simple questions, tell you the time/date, and chat with you!",
-                "Try asking me about the time, date, or just have a casual conversation!",
-                "I can: greet you, tell the time, share the date, and answer basic questions."
-            ],
-            r'\bthanks\b|\bthank you\b|\bappreciate it\b': [
-                "You're welcome!",
-                "Happy to help!",
-                "Anytime! Glad I could assist."
-            ],
-            r'\bgoodbye\b|\bbye\b|\bsee you\b': [
-                "Goodbye! Have a great day!",
-                "See you later!",
-                "Bye! Take care!"
-            ],
-            r'\bhow do i\b.*': [
-                "I'd be happy to help! Can you be more specific about what you need?",
-                "That's a good question! Try to be more specific so I can help better.",
-            ],
-        }
+        # Intents live in intents/simple.json and reload when the file changes
+        self.intents = load_pack('simple')
+        # Memoized answers for repeated questions
+        self.cache = ResponseCache(max_size=256)
         self.default_responses = [
             "I'm not sure I understand. Could you rephrase that?",
             "That's interesting! Tell me more.",
@@ -82,21 +43,39 @@ class SimpleChatbot:
         """Generate a response based on user input"""
         user_input_lower = user_input.lower().strip()
         
-        # Check against each pattern
-        for pattern, responses in self.responses.items():
-            if re.search(pattern, user_input_lower):
-                # Select a response
-                response = responses[0] if responses else "I don't know how to respond."
-                
-                # If it's a callable (lambda), call it
-                if callable(response):
-                    return response()
-                return response
+        # Serve repeated questions from the cache (emptied when the pack changes)
+        if self.intents.reload_if_changed():
+            self.cache.clear()
+        cached = self.cache.get(user_input)
+        if cached is not None:
+            return cached
+        
+        # Check all patterns in a single pass
+        intent = self.intents.lookup(user_input_lower)
+        if intent is not None:
+            response = self.intents.render(intent, name=self.name)
+            # Time/date answers change on every call, so they are never cached
+            if not intent.dynamic:
+                self.cache.put(user_input, response, ttl=intent.ttl)
+            return response
         
         # Default response
         import random
         return random.choice(self.default_responses)
 
+    def get_responses(self, user_inputs, workers=None):
+        """Generate a response for each input - yields responses in order"""
+        import random
+        
+        # Normalize lazily so large transcripts stream through
+        user_inputs = (user_input.lower().strip() for user_input in user_inputs)
+        
+        for intent in self.intents.classify_many(user_inputs, workers=workers):
+            if intent is not None:
+                yield self.intents.render(intent, name=self.name)
+            else:
+                yield random.choice(self.default_responses)
+
     def speak(self, text):
         """Convert text to speech"""
         print(f"🤖 ChatBot: {text}\n")
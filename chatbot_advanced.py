@@ -12,12 +12,20 @@ import re
 from datetime import datetime
 import subprocess
 import os
+import itertools
+from intent_packs import load_pack
+from faq_retrieval import load_faq_index
 
 class AdvancedAIChatbot:
     def __init__(self):
         self.name = "AI ChatBot"
         self.conversation_history = []
         
+        # Knowledge base lives in intents/advanced.json, compiled once and keyword-indexed
+        self.knowledge = load_pack('advanced')
+        # Local TF-IDF search over faq/corpus.json (None if numpy is missing)
+        self.faq = load_faq_index()
+        
         print("\n" + "="*60)
         print(f"🤖  {self.name} - Advanced AI Edition")
         print("="*60)
@@ -30,61 +38,33 @@ class AdvancedAIChatbot:
         """Generate intelligent AI response"""
         user_lower = user_input.lower().strip()
         
-        # Enhanced knowledge base
-        knowledge_base = {
-            # Greetings
-            r'(hello|hi|hey|greetings)': "Hello! I'm your AI assistant. What can I help you with?",
-            r'(good morning|good afternoon|good evening)': f"Good {self.get_time_period()}! How are you doing today?",
-            
-            # Personal questions
-            r'(how are you|how are things|how\'s it going)': "I'm doing great! Thanks for asking. Ready to help with anything!",
-            r'(what\'s your name|who are you|introduce yourself)': "I'm an AI ChatBot, your intelligent assistant. I'm here to answer your questions!",
-            r'(how old are you|when were you created)': "I'm a modern AI assistant created to help you with information and conversations!",
-            
-            # About AI
-            r'(what is ai|what is artificial intelligence)': "AI is intelligent machines that can learn and make decisions. I can understand questions and provide helpful answers!",
-            r'(how do you work|how do you think)': "I analyze your input, search my knowledge, and generate relevant responses to help you.",
-            r'(are you human|are you real)': "No, I'm an AI - a computer program designed to chat and help you intelligently!",
-            
-            # Time & Date
-            r'(what time is it|current time|what\'s the time)': f"It's {datetime.now().strftime('%I:%M %p')} right now.",
-            r'(what is the date|today\'s date|what day is it)': f"Today is {datetime.now().strftime('%A, %B %d, %Y')}.",
-            
-            # Capabilities
-            r'(what can you do|what are your capabilities|help me)': "I can answer questions, have conversations, provide information, tell time/date, and much more! Ask me anything!",
-            r'(can you help me|can you assist)': "Of course! I'd be happy to help. What do you need assistance with?",
-            
-            # Knowledge questions
-            r'(what is python|about python)': "Python is a popular programming language known for simplicity and power. It's used for web development, data science, AI, and more!",
-            r'(what is machine learning)': "Machine learning is a type of AI where computers learn from data to make predictions without being explicitly programmed.",
-            r'(what is deep learning)': "Deep learning uses neural networks with many layers to process complex data. It powers modern AI!",
-            r'(how does the internet work)': "The internet connects computers worldwide through networks and protocols. Data travels as packets between devices using IP addresses.",
-            r'(what is cloud computing)': "Cloud computing means using remote servers on the internet to store and process data instead of your local computer.",
-            
-            # Fun
-            r'(tell me a joke|make me laugh)': "Why do programmers prefer dark mode? Because light attracts bugs! 😄",
-            r'(are you smart|how intelligent are you)': "I'm designed to be helpful and intelligent! I can understand context and provide useful answers.",
-            r'(what do you like|what are your interests)': "I'm interested in learning about anything! I enjoy conversations about technology, science, and helping people.",
-            
-            # Polite
-            r'(thank you|thanks|appreciate it)': "You're welcome! Happy to help. What else can I do for you?",
-            r'(sorry|my apologies)': "No problem at all! Don't worry. How can I assist you?",
-            r'(you are awesome|you are helpful)': "Thank you! That's kind of you to say. I'm here to make things easier for you!",
-            
-            # Goodbye
-            r'(bye|goodbye|see you|farewell)': "Goodbye! It was great chatting with you. Have a wonderful day!",
-        }
-        
         # Check knowledge base
-        for pattern, response in knowledge_base.items():
-            if re.search(pattern, user_lower):
-                return response
+        response = self.knowledge.respond(user_lower, period=self.get_time_period)
+        if response is not None:
+            return response
         
         # Smart fallback response
         return self.generate_smart_response(user_input)
 
+    def get_ai_responses(self, user_inputs, workers=None):
+        """Generate a response for each input - yields responses in order"""
+        inputs, normalized = itertools.tee(user_inputs)
+        normalized = (user_input.lower().strip() for user_input in normalized)
+        
+        for user_input, intent in zip(inputs, self.knowledge.classify_many(normalized, workers=workers)):
+            if intent is not None:
+                yield self.knowledge.render(intent, period=self.get_time_period)
+            else:
+                yield self.generate_smart_response(user_input)
+
     def generate_smart_response(self, user_input):
         """Generate response for unknown questions"""
+        # Try the local FAQ corpus before falling back to a canned reply
+        if self.faq is not None:
+            answer = self.faq.best_answer(user_input)
+            if answer:
+                return answer
+        
         responses = [
             f"That's a great question about '{user_input.split()[0] if user_input.split() else 'that'}'! I'm learning more about this every day.",
             f"Interesting! I don't have specific information about that, but it sounds important. Can you tell me more?",
@@ -4,12 +4,24 @@ import subprocess
 import os
 import time
 from transformers import pipeline
-import wikipedia
 import random
+from response_cache import ResponseCache
+from http_session import shared_session
+from wiki_client import WikiClient
 
 class AdvancedChatbot:
-    def __init__(self):
+    # Seconds an answer stays cached, per model that produced it
+    CACHE_TTLS = {
+        'qa': 86400,
+        'generated': 3600,
+    }
+
+    def __init__(self, cache_ttls=None, session=None):
         self.name = "AI ChatBot"
+        # Pooled HTTP session for online lookups, shared with the other bots in the process
+        self.session = session or shared_session()
+        self.wiki = WikiClient(self.session)
+        self.cache = ResponseCache(max_size=256, ttls={**self.CACHE_TTLS, **(cache_ttls or {})})
         print("\n🤖 Initializing AI ChatBot...")
         print("Loading AI models (this may take a moment)...\n")
         
@@ -41,15 +53,19 @@ class AdvancedChatbot:
 
     def get_ai_response(self, user_input):
         """Get response using AI models"""
+        # Model runs are slow - reuse answers to repeated questions
+        cached = self.cache.get(user_input)
+        if cached is not None:
+            return cached
         
         # Try question-answering first
         if self.qa_pipeline:
             try:
                 # Search Wikipedia for context
                 try:
-                    search_results = wikipedia.search(user_input, results=1)
-                    if search_results:
-                        context = wikipedia.summary(search_results[0], sentences=5)
+                    page = self.wiki.lookup(user_input, sentences=5)
+                    if page:
+                        context = page.extract
                     else:
                         context = user_input
                 except:
@@ -60,6 +76,7 @@ class AdvancedChatbot:
                 if result and result.get('answer'):
                     confidence = result.get('score', 0)
                     if confidence > 0.1:
+                        self.cache.put(user_input, result['answer'], intent='qa')
                         return result['answer']
             except Exception as e:
                 pass
@@ -69,6 +86,7 @@ class AdvancedChatbot:
             try:
                 response = self.chat_pipeline(user_input, max_length=150, num_beams=4, early_stopping=True)
                 if response and len(response) > 0:
+                    self.cache.put(user_input, response[0]['generated_text'], intent='generated')
                     return response[0]['generated_text']
             except Exception as e:
                 pass
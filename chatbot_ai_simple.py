@@ -1,13 +1,15 @@
 import re
-from datetime import datetime
 import subprocess
 import os
 import requests
 import json
+import itertools
+from intent_packs import load_pack
 
 class AIEnabledChatbot:
     def __init__(self):
         self.name = "AI ChatBot"
+        self.intents = load_pack('ai_simple')
         print("\n🤖 AI ChatBot Started")
         print("="*50)
         print("Features: Voice Input + AI Responses + Voice Output")
@@ -50,31 +52,25 @@ class AIEnabledChatbot:
         """Simple AI response without API"""
         user_lower = user_input.lower()
         
-        # Knowledge base
-        responses = {
-            'hello|hi|hey': "Hello! I'm an AI chatbot. How can I help you today?",
-            'how are you|how do you do': "I'm functioning well! Thanks for asking. How can I assist you?",
-            'what is your name|who are you': "I'm an AI-powered chatbot designed to answer your questions.",
-            'what time is it': f"The current time is {datetime.now().strftime('%I:%M %p')}.",
-            'what is the date|what\' the date': f"Today is {datetime.now().strftime('%A, %B %d, %Y')}.",
-            'what can you do|capabilities': "I can answer questions, provide information, tell time/date, and have conversations!",
-            'thank you|thanks': "You're welcome! Happy to help.",
-            'goodbye|bye|exit': "Goodbye! Have a great day!",
-            'what is python': "Python is a versatile programming language used for web development, data science, AI, and more.",
-            'what is ai|artificial intelligence': "AI is the simulation of human intelligence processes by computer systems. It learns from data and makes decisions.",
-            'tell me a joke': "Why don't scientists trust atoms? Because they make up everything!",
-            'what is machine learning': "Machine learning is a type of AI where systems learn from data without being explicitly programmed.",
-            'how does the internet work': "The internet uses a network of connected computers that communicate using protocols like HTTP and TCP/IP.",
-        }
-        
-        # Check for matching patterns
-        for pattern, response in responses.items():
-            if re.search(pattern, user_lower):
-                return response
+        # Check the knowledge base in intents/ai_simple.json
+        response = self.intents.respond(user_lower)
+        if response is not None:
+            return response
         
         # Default response for unknown questions
         return f"That's an interesting question about '{user_input}'. I'm learning more about this topic every day. Can you provide more details?"
 
+    def get_simple_ai_responses(self, user_inputs, workers=None):
+        """Simple AI responses for many inputs - yields responses in order"""
+        inputs, normalized = itertools.tee(user_inputs)
+        normalized = (user_input.lower() for user_input in normalized)
+        
+        for user_input, intent in zip(inputs, self.intents.classify_many(normalized, workers=workers)):
+            if intent is not None:
+                yield self.intents.render(intent)
+            else:
+                yield f"That's an interesting question about '{user_input}'. I'm learning more about this topic every day. Can you provide more details?"
+
     def speak(self, text):
         """Convert text to speech using Windows PowerShell"""
         print(f"🤖 ChatBot: {text}\n")
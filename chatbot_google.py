@@ -6,18 +6,80 @@ for real-time answers to any question
 """
 
 import re
-from datetime import datetime
 import subprocess
-import os
-import requests
-import json
-import wikipedia
-from urllib.parse import quote
 import time
+import functools
+from source_runner import SourceRunner
+from answer_cache import MISS, AnswerCache, cached_source
+from singleflight import shared_flight
+from response_cache import normalize
+from swr_cache import SWRCache
+from weather_client import FORECAST_URL, WeatherClient
+from wiki_client import API_URL as WIKI_API_URL, WikiClient, next_passage
+from prefetch import Prefetcher, is_follow_up
+from extractors import EXTRACTORS
+from answer_stream import SpeechQueue, normalize_stream
+from circuit_breaker import BreakerBoard
+from http_session import shared_session
+from health import HealthProbe
+from rate_limit import shared_limiter
+from query_router import DEFINITION, GENERAL, NEWS, WEATHER, QueryRouter, classify
 
 class GooglePoweredChatbot:
-    def __init__(self):
+    # Seconds a turn may spend waiting on online sources
+    TURN_BUDGET = 2.5
+    # Seconds before a still-running source gets a duplicate (hedged) request
+    HEDGE_AFTER = 1.0
+    # Upstreams probed in the background at startup
+    HEALTH_PROBES = {
+        # Google answers come from SerpAPI; its account endpoint costs no search credits
+        'serpapi': 'https://serpapi.com/account',
+        'wikipedia': WIKI_API_URL,
+        'weather': FORECAST_URL,
+        'news': 'https://newsapi.org/',
+    }
+    # Seconds a source's answer stays in the on-disk cache shared across runs
+    ANSWER_TTLS = {
+        'google': 3600,
+        'wikipedia': 7 * 86400,
+        'weather': 600,
+        'news': 900,
+    }
+    # Sources asked for each kind of question, in order of preference
+    ROUTES = {
+        WEATHER: ['Weather'],
+        NEWS: ['News', 'Google Search'],
+        DEFINITION: ['Wikipedia', 'Google Search'],
+        GENERAL: ['Google Search', 'Wikipedia'],
+    }
+
+    def __init__(self, session=None):
         self.name = "Google AI ChatBot"
+        self.last_skipped = []
+        self.runner = SourceRunner(max_workers=8)
+        # Pooled keep-alive connections shared by every source (and every bot in the process)
+        self.session = session or shared_session()
+        # Upstreams that keep failing are skipped until a probe finds them back up
+        self.breakers = BreakerBoard(failure_threshold=3, cooldown=60)
+        self.router = QueryRouter(self.ROUTES)
+        # Wikipedia searches and summaries: popular topics are served from memory
+        # and refreshed in the background once they are an hour old
+        self.wiki_cache = SWRCache(max_size=512, soft_ttl=3600, hard_ttl=7 * 86400)
+        self.wiki = WikiClient(self.session)
+        # Known cities skip geocoding; conditions are reused per grid cell for 10 minutes
+        self.weather = WeatherClient(get=functools.partial(self.breakers.call, 'weather', self.session.get))
+        self.answer_cache = AnswerCache('google', ttls=self.ANSWER_TTLS)
+        # Users asking the same question at once share one upstream lookup per source
+        self.flight = shared_flight()
+        # Likely follow-ups are fetched while an answer is spoken; "tell me more" continues the topic
+        self.prefetcher = Prefetcher(max_fetches=4, time_budget=20)
+        self.last_query = None
+        self.last_page = None
+        self.more_position = 0
+        # Prefetch generation of the last topic - only its prefetched page is taken
+        self.topic = None
+        # Sentences are spoken in order on a background thread while the rest of the answer is shown
+        self.speech = SpeechQueue(self.say_aloud, max_chars=800)
         
         print("\n" + "="*70)
         print(f"🌐 {self.name} - Google Powered Edition")
@@ -33,8 +95,11 @@ class GooglePoweredChatbot:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
-    def search_google_via_serpapi(self, query):
+    @cached_source('google')
+    def search_google_via_serpapi(self, query, timeout=5):
         """Search Google using SerpAPI (free tier available)"""
+        if self.breakers.is_open('serpapi'):
+            return None
         try:
             print("  🔍 Searching Google (SerpAPI)...", end=" ", flush=True)
             
@@ -44,7 +109,7 @@ class GooglePoweredChatbot:
                 'api_key': 'demo'  # Free demo key for testing
             }
             
-            response = requests.get(url, params=params, timeout=5)
+            response = self.breakers.call('serpapi', self.session.get, url, params=params, timeout=timeout)
             if response.status_code == 200:
                 data = response.json()
                 
@@ -82,29 +147,15 @@ class GooglePoweredChatbot:
                 'gl': 'us'
             }
             
-            session = requests.Session()
-            response = session.get(url, params=params, headers=self.headers, timeout=5)
+            response = self.session.get(url, params=params, headers=self.headers, timeout=5, stream=True)
             
             if response.status_code == 200:
-                # Parse for featured snippet or first result
-                import re as regex
-                
-                # Look for knowledge panel or featured snippet
-                patterns = [
-                    r'<span[^>]*>([^<]{100,500})</span>',  # Knowledge panel
-                    r'<span[^>]*class="[^"]*snippet[^"]*"[^>]*>([^<]{50,300})</span>',
-                ]
-                
-                text = response.text
-                for pattern in patterns:
-                    matches = regex.findall(pattern, text)
-                    if matches:
-                        answer = matches[0].strip()
-                        # Clean HTML entities
-                        answer = answer.replace('&quot;', '"').replace('&#39;', "'")
-                        if len(answer) > 30:
-                            print("✓ Found (Google)!")
-                            return answer
+                # Look for knowledge panel or featured snippet - the download stops at the first one
+                answer = EXTRACTORS['google'].from_response(response)
+                if answer:
+                    print("✓ Found (Google)!")
+                    return answer
+            response.close()
             
             print("✗ No results")
         except Exception as e:
@@ -128,37 +179,30 @@ class GooglePoweredChatbot:
         except Exception as e:
             return None
 
-    def search_wikipedia_detailed(self, query):
+    def wikipedia_lookup(self, query, timeout=5):
+        """Best Wikipedia page for `query`, served from the stale-while-revalidate cache"""
+        return self.wiki_cache.get(('lookup', normalize(query)),
+                                   lambda: self.breakers.call('wikipedia', self.wiki.lookup, query, timeout=timeout),
+                                   timeout=timeout)
+
+    @cached_source('wikipedia')
+    def search_wikipedia_detailed(self, query, timeout=None):
         """Search Wikipedia for detailed answers"""
+        if self.breakers.is_open('wikipedia'):
+            return None
         try:
             print("  📚 Searching Wikipedia...", end=" ", flush=True)
             
-            # Search for the topic
-            search_results = wikipedia.search(query, results=1)
+            # Search hit and intro extract in one request; disambiguation pages are skipped
+            page = self.wikipedia_lookup(query, timeout=timeout or 5)
             
-            if search_results:
-                try:
-                    # Get the detailed summary
-                    page = wikipedia.page(search_results[0], auto_suggest=True)
-                    summary = page.summary
-                    
-                    # Get first few sentences (approximately 500 chars)
-                    sentences = summary.split('.')
-                    answer = '. '.join(sentences[:4]) + '.'
-                    
-                    print("✓ Found (Wikipedia)!")
-                    return answer
-                except wikipedia.exceptions.DisambiguationError as e:
-                    # Handle disambiguation
-                    if e.options:
-                        page = wikipedia.page(e.options[0], auto_suggest=True)
-                        summary = page.summary
-                        sentences = summary.split('.')
-                        answer = '. '.join(sentences[:4]) + '.'
-                        print("✓ Found (Wikipedia)!")
-                        return answer
-                except:
-                    pass
+            if page:
+                # Get first few sentences (approximately 500 chars)
+                sentences = page.extract.split('.')
+                answer = '. '.join(sentences[:4]) + '.'
+                
+                print("✓ Found (Wikipedia)!")
+                return answer
             
             print("✗ No results")
         except Exception as e:
@@ -166,52 +210,33 @@ class GooglePoweredChatbot:
         
         return None
 
-    def search_weather(self, query):
+    @cached_source('weather')
+    def search_weather(self, query, timeout=5):
         """Get weather information from Open-Meteo"""
         try:
-            if any(word in query.lower() for word in ['weather', 'temperature', 'climate', 'rain', 'wind', 'forecast', 'cold', 'hot']):
+            # Both requests share the one timeout
+            deadline = time.monotonic() + timeout
+
+            if classify(query) == WEATHER and not self.breakers.is_open('weather'):
                 print("  🌤️  Checking Weather API...", end=" ", flush=True)
                 
                 # Extract city name
                 city = query.lower()
-                city = re.sub(r'(weather|temperature|in|climate|rain|wind|forecast|is it)', '', city).strip()
+                city = re.sub(r'\b(weather|temperature|in|climate|rain|wind|forecast|is it)\b', '', city).strip()
                 
                 if not city or len(city) < 2:
                     city = "London"
                 
                 # Use Open-Meteo Geocoding API
-                url = "https://geocoding-api.open-meteo.com/v1/search"
-                params = {
-                    'name': city,
-                    'count': 1,
-                    'language': 'en'
-                }
-                
-                response = requests.get(url, params=params, timeout=5)
-                if response.status_code == 200:
-                    geo_data = response.json()
-                    if geo_data.get('results') and len(geo_data['results']) > 0:
-                        loc = geo_data['results'][0]
-                        lat, lon = loc['latitude'], loc['longitude']
-                        city_name = loc.get('name', 'Unknown')
-                        country = loc.get('country', '')
-                        
-                        # Get current weather
-                        weather_url = "https://api.open-meteo.com/v1/forecast"
-                        weather_params = {
-                            'latitude': lat,
-                            'longitude': lon,
-                            'current': 'temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m,precipitation'
-                        }
-                        
-                        w_response = requests.get(weather_url, params=weather_params, timeout=5)
-                        if w_response.status_code == 200:
-                            w_data = w_response.json()
-                            current = w_data['current']
-                            
-                            result = f"Current weather in {city_name}, {country}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind Speed: {current['wind_speed_10m']} km/h, Precipitation: {current['precipitation']}mm"
-                            print("✓ Found!")
-                            return result
+                loc = self.weather.locate(query, city, timeout=timeout)
+                if loc:
+                    # Get current weather
+                    remaining = max(0.05, deadline - time.monotonic())
+                    current = self.weather.current(loc['latitude'], loc['longitude'], timeout=remaining)
+                    if current:
+                        result = f"Current weather in {loc['name']}, {loc['country']}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind Speed: {current['wind_speed_10m']} km/h, Precipitation: {current['precipitation']}mm"
+                        print("✓ Found!")
+                        return result
                 
                 print("✗ No results")
         except Exception as e:
@@ -219,10 +244,11 @@ class GooglePoweredChatbot:
         
         return None
 
-    def search_news(self, query):
+    @cached_source('news')
+    def search_news(self, query, timeout=5):
         """Search for latest news"""
         try:
-            if any(word in query.lower() for word in ['news', 'latest', 'recent', 'today', 'current']):
+            if classify(query) == NEWS and not self.breakers.is_open('newsapi'):
                 print("  📰 Searching News...", end=" ", flush=True)
                 
                 # Using free news API
@@ -234,7 +260,7 @@ class GooglePoweredChatbot:
                     'language': 'en'
                 }
                 
-                response = requests.get(url, params=params, timeout=5)
+                response = self.breakers.call('newsapi', self.session.get, url, params=params, timeout=timeout)
                 if response.status_code == 200 or response.status_code == 401:
                     # Even with 401, we might get data
                     data = response.json()
@@ -256,77 +282,132 @@ class GooglePoweredChatbot:
         print(f"\n📡 Searching for: '{query}'")
         print("  Checking multiple sources...")
         
-        # Try different sources in order of preference
-        sources = [
-            ('Google Search', self.search_google_via_serpapi),
-            ('Wikipedia', self.search_wikipedia_detailed),
-            ('Weather', self.search_weather),
-            ('News', self.search_news),
-        ]
+        sources = {
+            'Google Search': self.search_google_via_serpapi,
+            'Wikipedia': self.search_wikipedia_detailed,
+            'Weather': self.search_weather,
+            'News': self.search_news,
+        }
         
-        for source_name, search_func in sources:
-            try:
-                answer = search_func(query)
-                if answer and len(answer.strip()) > 10:
-                    return answer
-            except Exception as e:
-                continue
+        # Only the sources for this kind of question run - all at once under one turn budget;
+        # general sources get whatever budget is left if they find nothing
+        kind, names = self.router.route(query)
+        print(f"  🧭 Routed as {kind}: {', '.join(names)}")
         
-        return None
+        deadline = time.monotonic() + self.TURN_BUDGET
+        result = self.runner.best_within([(name, sources[name]) for name in names], query,
+                                         budget=self.TURN_BUDGET, hedge_after=self.HEDGE_AFTER)
+        fallback = self.router.fallback(kind)
+        remaining = deadline - time.monotonic()
+        if result.answer is None and fallback and remaining > 0.1:
+            print(f"  🧭 Falling back to: {', '.join(fallback)}")
+            result = self.runner.best_within([(name, sources[name]) for name in fallback], query,
+                                             budget=remaining, hedge_after=self.HEDGE_AFTER)
+        self.last_skipped = result.skipped
+        if result.skipped:
+            print(f"\n  ⏱️  Turn budget used up - skipped: {', '.join(result.skipped)}")
+        
+        return result.answer
+
+    def more_about(self, title):
+        """The article `title` past its introduction - usually prefetched while the last answer was spoken"""
+        text = self.answer_cache.get('more', title)
+        if text is MISS:
+            text = self.breakers.call('wikipedia', self.wiki.more, title)
+            self.answer_cache.put('more', title, text)
+        return text
+
+    def tell_me_more(self):
+        """The next passage of the last topic's Wikipedia article, or None"""
+        if self.last_page is None:
+            self.last_page = self.prefetcher.kept(self.topic) or self.wikipedia_lookup(self.last_query)
+        if self.last_page is None:
+            return None
+        text = self.more_about(self.last_page.title)
+        if not text:
+            return None
+        passage, self.more_position = next_passage(text, self.more_position, limit=1500)
+        return passage or None
+
+    def prefetch_follow_ups(self, turn, query):
+        """Warm the caches with likely follow-ups to `query` while its answer is spoken"""
+        if classify(query) == WEATHER:
+            return
+        page = turn.run(self.wikipedia_lookup, query)
+        if page is None:
+            return
+        # Taken by tell_me_more only while this is still the last topic
+        turn.keep(page)
+        # "Tell me more": the rest of the article
+        turn.run(self.more_about, page.title)
+        # Other pages the search matched - the question may have meant one of them
+        for title in page.alternatives[:2]:
+            turn.run(self.wikipedia_lookup, title)
 
     def get_response(self, user_input):
         """Get comprehensive response for user input"""
+        return ' '.join(self.get_response_stream(user_input))
+
+    def get_response_stream(self, user_input):
+        """Yield the response as clean sentences, each as soon as it is ready"""
+        if is_follow_up(user_input) and self.last_query:
+            try:
+                passage = self.tell_me_more()
+            except Exception:
+                passage = None
+            if passage:
+                yield from normalize_stream([passage], limit=1500)
+                return
+            
         try:
             # Get answer from internet
             answer = self.get_comprehensive_answer(user_input)
-            
-            if answer:
-                # Clean up the answer
-                answer = answer.strip()
-                # Remove wiki citations
-                answer = re.sub(r'\[\d+\]', '', answer)
-                # Remove HTML entities
-                answer = answer.replace('&nbsp;', ' ').replace('&quot;', '"').replace('&#39;', "'")
-                # Remove excessive whitespace
-                answer = ' '.join(answer.split())
-                
-                # Limit length
-                if len(answer) > 1500:
-                    answer = answer[:1500] + "..."
-                
-                return answer
-            else:
-                return f"I couldn't find specific information about '{user_input}' from available sources. Try rephrasing your question or ask something more specific."
-        
         except Exception as e:
-            return f"I encountered an issue searching for information: {str(e)}"
+            yield f"I encountered an issue searching for information: {str(e)}"
+            return
+        
+        if answer:
+            # Citations, HTML entities and extra whitespace are cleaned in one pass,
+            # and a long answer ends at a word boundary after 1500 characters
+            yield from normalize_stream([answer], limit=1500)
+        else:
+            yield f"I couldn't find specific information about '{user_input}' from available sources. Try rephrasing your question or ask something more specific."
 
     def speak(self, text):
         """Convert text to speech using Windows PowerShell"""
-        # Limit text length for display
-        display_text = text[:300] + "..." if len(text) > 300 else text
-        print(f"\n🤖 ChatBot: {display_text}\n")
+        self.speak_stream([text])
+
+    def speak_stream(self, sentences):
+        """Show and speak an answer sentence by sentence, as each one is ready"""
+        print("\n🤖 ChatBot:", end="", flush=True)
+        self.speech.start()
+        shown = 0
+        for sentence in sentences:
+            # Limit text length for display
+            if shown < 300:
+                display_text = sentence if shown + len(sentence) <= 300 else sentence[:300 - shown] + "..."
+                print(f" {display_text}", end="", flush=True)
+            shown += len(sentence) + 1
+            self.speech.say(sentence)
+        print("\n")
+
+    def say_aloud(self, text):
+        """Speak text with the Windows speech synthesizer; returns once it has been said"""
+        speech_text = text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
+        speech_text = speech_text.replace('&', 'and')
         
-        try:
-            # Limit speech to first 800 characters
-            speech_text = text[:800] if len(text) > 800 else text
-            speech_text = speech_text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
-            speech_text = speech_text.replace('&', 'and')
-            
-            ps_command = f'''
+        ps_command = f'''
 Add-Type -AssemblyName System.Speech
 $synthesizer = New-Object System.Speech.Synthesis.SpeechSynthesizer
 $synthesizer.Rate = -1
 $synthesizer.Volume = 100
 $synthesizer.Speak("{speech_text}")
 '''
-            subprocess.Popen(
-                ['powershell', '-NoProfile', '-Command', ps_command],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-        except Exception as e:
-            pass
+        subprocess.run(
+            ['powershell', '-NoProfile', '-Command', ps_command],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
 
     def listen_voice(self):
         """Listen for voice input using Windows Speech Recognition"""
@@ -385,6 +466,16 @@ try {
         
         return user_input
 
+    def check_upstreams(self):
+        """Probe this bot's upstreams in the background; what is reachable is printed once known"""
+        def done(probe):
+            if probe.reachable():
+                print(f"\n✓ Internet connection detected! ({probe.report()})")
+            else:
+                print("\n⚠️  Warning: No internet connection detected!")
+                print("This chatbot needs internet to work properly.\n")
+        return HealthProbe(self.HEALTH_PROBES, on_done=done).start()
+
     def chat(self):
         """Main chat loop"""
         print(f"{'='*70}")
@@ -402,6 +493,8 @@ try {
         while True:
             try:
                 user_input = self.listen()
+                # A new turn has started - drop whatever is still being prefetched for the last one
+                self.prefetcher.cancel()
                 
                 if not user_input:
                     continue
@@ -420,11 +513,12 @@ try {
                 
                 # Get answer from internet
                 question_count += 1
-                response = self.get_response(user_input)
-                self.speak(response)
+                self.speak_stream(self.get_response_stream(user_input))
                 
-                # Small delay between requests
-                time.sleep(1)
+                # Use the time the answer is spoken and the next question listened for
+                if not is_follow_up(user_input):
+                    self.last_query, self.last_page, self.more_position = user_input, None, 0
+                    self.topic = self.prefetcher.start(self.prefetch_follow_ups, user_input)
                 
             except KeyboardInterrupt:
                 print("\n")
@@ -432,17 +526,21 @@ try {
                 break
             except Exception as e:
                 print(f"Error: {e}")
+        
+        self.speech.wait()
+        for line in self.breakers.report():
+            print(f"🔌 {line}")
+        print(f"🚦 {shared_limiter().report()}")
+        print(f"🧭 Questions by kind: {self.router.report()}")
+        print(f"💾 {self.answer_cache.report()}")
+        print(f"🔗 {self.flight.report()}")
+        print(f"🔮 {self.prefetcher.report()}")
+        print(f"💾 {self.wiki_cache.report()}")
 
 if __name__ == "__main__":
-    # Check internet connection
-    try:
-        requests.get('https://www.google.com', timeout=2)
-        print("✓ Internet connection detected!")
-    except:
-        print("⚠️  Warning: No internet connection detected!")
-        print("This chatbot needs internet to work properly.\n")
-    
     chatbot = GooglePoweredChatbot()
+    # Upstreams are checked in the background while the greeting is spoken
+    chatbot.check_upstreams()
     chatbot.chat()
     
     print("\n" + "="*70)
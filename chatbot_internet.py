@@ -6,18 +6,96 @@ for real-time answers to any question
 """
 
 import re
-from datetime import datetime
 import subprocess
-import os
-import requests
-import json
-import wikipedia
 from urllib.parse import quote
 import time
+import functools
+from response_cache import ResponseCache
+from source_runner import SourceRunner
+from async_providers import (DuckDuckGoProvider, ProviderContext, ProviderLoop, ThreadProvider, WebProvider,
+                             WikipediaProvider, first_answer)
+from answer_cache import MISS, AnswerCache, cached_source
+from singleflight import shared_flight
+from circuit_breaker import BreakerBoard
+from http_session import shared_session
+from health import HealthProbe
+from rate_limit import shared_limiter
+from weather_client import FORECAST_URL, WeatherClient
+from wiki_client import API_URL as WIKI_API_URL, WikiClient, next_passage
+from prefetch import Prefetcher, is_follow_up
+from extractors import EXTRACTORS
+from answer_stream import SpeechQueue, normalize_stream
+from query_router import DEFINITION, GENERAL, NEWS, TIME, WEATHER, QueryRouter, classify
 
 class AdvancedOnlineAIChatbot:
-    def __init__(self):
+    # Seconds an answer stays cached, per source that produced it
+    CACHE_TTLS = {
+        'web': 1800,
+        'wikipedia': 86400,
+        'weather': 600,
+        'duckduckgo': 86400,
+    }
+    # Kinds of question whose answers are stale within minutes - never memoized
+    UNCACHED_KINDS = {TIME, NEWS}
+    # Upstreams probed in the background at startup
+    HEALTH_PROBES = {
+        'web': 'https://r.jina.ai/',
+        'duckduckgo': 'https://api.duckduckgo.com/',
+        'wikipedia': WIKI_API_URL,
+        'weather': FORECAST_URL,
+        'google': 'https://www.google.com/',
+    }
+    # Seconds a source's answer stays in the on-disk cache shared across runs
+    ANSWER_TTLS = {
+        'google': 3600,
+        'web': 1800,
+        'wikipedia': 7 * 86400,
+        'duckduckgo': 7 * 86400,
+        'weather': 600,
+    }
+    # Sources asked for each kind of question, best first
+    ROUTES = {
+        WEATHER: ['weather'],
+        NEWS: ['web'],
+        DEFINITION: ['wikipedia', 'duckduckgo'],
+        GENERAL: ['web', 'wikipedia'],
+    }
+
+    def __init__(self, cache_ttls=None, session=None):
         self.name = "Online AI ChatBot"
+        # Repeated questions are answered from memory until their source's TTL runs out
+        self.cache = ResponseCache(max_size=512, ttls={**self.CACHE_TTLS, **(cache_ttls or {})})
+        # Per-source latency, and the threads blocking sources run on
+        self.runner = SourceRunner(max_workers=6)
+        # Pooled keep-alive connections shared by every source (and every bot in the process)
+        self.session = session or shared_session()
+        self.wiki = WikiClient(self.session)
+        # Upstreams that keep failing are skipped until a probe finds them back up
+        self.breakers = BreakerBoard(failure_threshold=3, cooldown=60)
+        # Known cities skip geocoding; conditions are reused per grid cell for 10 minutes
+        self.weather = WeatherClient(get=functools.partial(self.breakers.call, 'weather', self.session.get))
+        self.router = QueryRouter(self.ROUTES)
+        self.answer_cache = AnswerCache('internet', ttls=self.ANSWER_TTLS)
+        # Users asking the same question at once share one upstream lookup per source
+        self.flight = shared_flight()
+        # Lookups run as coroutines on the process-wide event loop, through the same breakers and caches
+        self.providers = {
+            'web': WebProvider(),                         # Real-time web search
+            'wikipedia': WikipediaProvider(sentences=5),  # Wikipedia for detailed info
+            'duckduckgo': DuckDuckGoProvider(),           # Instant answers / definitions
+            # Weather data - the weather client is blocking, so it runs on the runner's threads
+            'weather': ThreadProvider('weather', self.search_openweather, executor=self.runner.executor),
+        }
+        self.provider_context = ProviderContext(self.breakers, self.answer_cache, record=self.runner.record)
+        # Likely follow-ups are fetched while an answer is spoken; "tell me more" continues the topic
+        self.prefetcher = Prefetcher(max_fetches=4, time_budget=20)
+        self.last_query = None
+        self.last_page = None
+        self.more_position = 0
+        # Prefetch generation of the last topic - only its prefetched page is taken
+        self.topic = None
+        # Sentences are spoken in order on a background thread while the rest of the answer is shown
+        self.speech = SpeechQueue(self.say_aloud, max_chars=500)
         
         print("\n" + "="*60)
         print(f"🌐 {self.name} - Google Powered")
@@ -33,6 +111,7 @@ class AdvancedOnlineAIChatbot:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
 
+    @cached_source('google')
     def search_google(self, query):
         """Search using Bing (free alternative - works reliably)"""
         try:
@@ -49,7 +128,7 @@ class AdvancedOnlineAIChatbot:
             }
             
             try:
-                response = requests.get(url, headers=headers, params=params, timeout=5)
+                response = self.breakers.call('bing', self.session.get, url, headers=headers, params=params, timeout=5)
                 if response.status_code == 200:
                     data = response.json()
                     if data.get('webPages') and data['webPages'].get('value'):
@@ -63,106 +142,14 @@ class AdvancedOnlineAIChatbot:
             
             # Fallback: Use direct web search via requests
             search_url = f"https://www.google.com/search?q={quote(query)}"
-            response = requests.get(search_url, headers=self.headers, timeout=5)
+            response = self.breakers.call('google', self.session.get, search_url, headers=self.headers, timeout=5, stream=True)
             if response.status_code == 200:
-                # Extract answer from page
-                import re as regex
-                # Look for featured snippet
-                matches = regex.findall(r'<span[^>]*>([^<]{50,300})</span>', response.text)
-                if matches:
-                    for match in matches:
-                        cleaned = match.strip()
-                        if len(cleaned) > 30 and not cleaned.startswith('<'):
-                            print("✓ Found!")
-                            return cleaned
-            
-            print("✗ No results")
-        except Exception as e:
-            print(f"✗ Error")
-        
-        return None
-
-    def search_web_instant(self, query):
-        """Search the web using instant answers from various sources"""
-        try:
-            print("  🌐 Searching instant answers...", end=" ", flush=True)
-            
-            # Use Jina Reader for real-time web content
-            url = f"https://r.jina.ai/https://www.google.com/search?q={quote(query)}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=5)
-            if response.status_code == 200 and len(response.text) > 50:
-                # Get first 500 chars of response
-                text = response.text[:500].strip()
-                if len(text) > 30:
+                # Look for featured snippet - the download stops at the first one
+                cleaned = EXTRACTORS['google_span'].from_response(response)
+                if cleaned:
                     print("✓ Found!")
-                    return text
-            
-            print("✗ No results")
-        except Exception as e:
-            print(f"✗ Error")
-        
-        return None
-
-    def search_duckduckgo(self, query):
-        """Search using DuckDuckGo (no auth needed)"""
-        try:
-            print("  🔍 Searching DuckDuckGo...", end=" ", flush=True)
-            
-            url = "https://api.duckduckgo.com/"
-            params = {
-                'q': query,
-                'format': 'json',
-                'no_redirect': 1
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                
-                # Check for direct answer
-                if data.get('AbstractText'):
-                    print("✓ Found!")
-                    return data.get('AbstractText')
-                elif data.get('Answer'):
-                    print("✓ Found!")
-                    return data.get('Answer')
-                
-                # Check related topics
-                if data.get('RelatedTopics'):
-                    topics = data.get('RelatedTopics')
-                    if topics and len(topics) > 0:
-                        text = topics[0].get('Text', '')
-                        if text:
-                            print("✓ Found!")
-                            return text
-            
-            print("✗ No results")
-        except Exception as e:
-            print(f"✗ Error")
-        
-        return None
-
-    def search_wikipedia(self, query):
-        """Search Wikipedia for answers"""
-        try:
-            print("  📚 Searching Wikipedia...", end=" ", flush=True)
-            
-            # Search for the topic
-            search_results = wikipedia.search(query, results=1)
-            
-            if search_results:
-                try:
-                    # Get the summary
-                    summary = wikipedia.summary(search_results[0], sentences=5)
-                    print("✓ Found!")
-                    return summary
-                except:
-                    pass
+                    return cleaned
+            response.close()
             
             print("✗ No results")
         except Exception as e:
@@ -170,8 +157,11 @@ class AdvancedOnlineAIChatbot:
         
         return None
 
+    @cached_source('web')
     def search_jina(self, query):
         """Search using Jina Reader (real-time web search)"""
+        if self.breakers.is_open('jina'):
+            return None
         try:
             print("  🌐 Searching web...", end=" ", flush=True)
             
@@ -182,11 +172,11 @@ class AdvancedOnlineAIChatbot:
                 'User-Agent': 'Mozilla/5.0'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = self.breakers.call('jina', self.session.get, url, headers=headers, timeout=5)
             if response.status_code == 200:
                 # Parse response
-                text = response.text[:500]
-                if text and len(text) > 10:
+                text = EXTRACTORS['jina'].from_response(response)
+                if text:
                     print("✓ Found!")
                     return text
             
@@ -196,44 +186,27 @@ class AdvancedOnlineAIChatbot:
         
         return None
 
+    @cached_source('weather')
     def search_openweather(self, query):
         """Get weather information"""
         try:
-            if any(word in query.lower() for word in ['weather', 'temperature', 'climate', 'rain', 'wind']):
+            if classify(query) == WEATHER and not self.breakers.is_open('weather'):
                 print("  🌤️  Checking weather API...", end=" ", flush=True)
                 
-                # Extract city name
-                city = query.replace('weather', '').replace('temperature', '').replace('in', '').strip()
+                # Extract city name (only used when the gazetteer does not know it)
+                city = re.sub(r'\b(weather|temperature|in|is it|what|whats|the)\b', '', query.lower())
+                city = re.sub(r"[^\w\s'-]", '', city).strip()
                 if not city:
                     city = "London"
                 
                 # Use Open-Meteo API (free, no auth required)
-                url = "https://geocoding-api.open-meteo.com/v1/search"
-                params = {'name': city, 'count': 1, 'language': 'en'}
-                
-                response = requests.get(url, params=params, timeout=5)
-                if response.status_code == 200:
-                    geo_data = response.json()
-                    if geo_data['results']:
-                        loc = geo_data['results'][0]
-                        lat, lon = loc['latitude'], loc['longitude']
-                        
-                        # Get weather
-                        weather_url = "https://api.open-meteo.com/v1/forecast"
-                        weather_params = {
-                            'latitude': lat,
-                            'longitude': lon,
-                            'current': 'temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m'
-                        }
-                        
-                        w_response = requests.get(weather_url, params=weather_params, timeout=5)
-                        if w_response.status_code == 200:
-                            w_data = w_response.json()
-                            current = w_data['current']
-                            
-                            result = f"Weather in {loc['name']}, {loc.get('country', '')}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind: {current['wind_speed_10m']} km/h"
-                            print("✓ Found!")
-                            return result
+                loc = self.weather.locate(query, city, timeout=5)
+                if loc:
+                    current = self.weather.current(loc['latitude'], loc['longitude'], timeout=5)
+                    if current:
+                        result = f"Weather in {loc['name']}, {loc['country']}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind: {current['wind_speed_10m']} km/h"
+                        print("✓ Found!")
+                        return result
                 
                 print("✗ No results")
         except Exception as e:
@@ -242,77 +215,141 @@ class AdvancedOnlineAIChatbot:
         return None
 
     def get_online_answer(self, query):
-        """Get answer from various online sources"""
+        """Get answer from various online sources - (source name, answer), or (None, None)"""
         
         print(f"\n📡 Searching internet for: '{query}'")
         print("  Checking multiple sources...")
         
-        # Try different sources in order - use working APIs
-        sources = [
-            self.search_web_instant,   # Real-time web search
-            self.search_wikipedia,     # Wikipedia for detailed info
-            self.search_openweather,   # Weather data
-        ]
+        # Only the sources for this kind of question run - at once, first usable answer wins and
+        # the rest are cancelled; general sources are tried only if they find nothing
+        kind, names = self.router.route(query)
+        print(f"  🧭 Routed as {kind}: {', '.join(names)}")
         
-        for source in sources:
-            try:
-                answer = source(query)
-                if answer and len(answer.strip()) > 10:
-                    return answer
-            except Exception as e:
-                continue
+        provider_loop = ProviderLoop.shared()
+        started = time.perf_counter()
+        source_name, answer = provider_loop.run(first_answer([self.providers[name] for name in names], self.provider_context, query))
+        fallback = self.router.fallback(kind)
+        if not answer and fallback:
+            print(f"  🧭 Falling back to: {', '.join(fallback)}")
+            source_name, answer = provider_loop.run(first_answer([self.providers[name] for name in fallback], self.provider_context, query))
+        if answer:
+            print(f"\n  ⏱️  Answer from {source_name} in {time.perf_counter() - started:.2f}s")
+            return source_name, answer
         
-        return None
+        return None, None
+
+    def more_about(self, title):
+        """The article `title` past its introduction - usually prefetched while the last answer was spoken"""
+        text = self.answer_cache.get('more', title)
+        if text is MISS:
+            text = self.breakers.call('wikipedia', self.wiki.more, title)
+            self.answer_cache.put('more', title, text)
+        return text
+
+    def tell_me_more(self):
+        """The next passage of the last topic's Wikipedia article, or None"""
+        if self.last_page is None:
+            self.last_page = self.prefetcher.kept(self.topic) or self.breakers.call('wikipedia', self.wiki.lookup, self.last_query, sentences=5)
+        if self.last_page is None:
+            return None
+        text = self.more_about(self.last_page.title)
+        if not text:
+            return None
+        passage, self.more_position = next_passage(text, self.more_position, limit=1000)
+        return passage or None
+
+    def prefetch_follow_ups(self, turn, query):
+        """Warm the caches with likely follow-ups to `query` while its answer is spoken"""
+        if classify(query) == WEATHER:
+            return
+        page = turn.run(self.breakers.call, 'wikipedia', self.wiki.lookup, query, sentences=5)
+        if page is None:
+            return
+        # Taken by tell_me_more only while this is still the last topic
+        turn.keep(page)
+        # "Tell me more": the rest of the article
+        turn.run(self.more_about, page.title)
+        # Other pages the search matched - the question may have meant one of them
+        for title in page.alternatives[:2]:
+            if self.answer_cache.get('wikipedia', title) is MISS:
+                other = turn.run(self.breakers.call, 'wikipedia', self.wiki.lookup, title, sentences=5)
+                if other is not None:
+                    self.answer_cache.put('wikipedia', title, other.extract)
 
     def get_response(self, user_input):
         """Get response for user input"""
+        return ' '.join(self.get_response_stream(user_input))
+
+    def get_response_stream(self, user_input):
+        """Yield the response as clean sentences, each as soon as it is ready"""
+        if is_follow_up(user_input) and self.last_query:
+            try:
+                passage = self.tell_me_more()
+            except Exception:
+                passage = None
+            if passage:
+                yield from normalize_stream([passage], limit=1000)
+                return
+            
         try:
-            # Get answer from internet
-            answer = self.get_online_answer(user_input)
+            cached = self.cache.get(user_input)
+            if cached is not None:
+                print("  ⚡ Answered from cache")
+                yield cached
+                return
             
-            if answer:
-                # Clean up the answer
-                answer = answer.strip()
-                # Remove wiki citations
-                answer = re.sub(r'\[\d+\]', '', answer)
-                # Remove excessive newlines
-                answer = ' '.join(answer.split())
-                
-                if len(answer) > 1000:
-                    answer = answer[:1000] + "..."
-                
-                return answer
-            else:
-                return f"I searched multiple sources but couldn't find specific information about '{user_input}'. Try rephrasing or ask something more specific."
-        
+            # Get answer from internet
+            source, answer = self.get_online_answer(user_input)
         except Exception as e:
-            return f"I encountered an issue searching the internet: {str(e)}"
+            yield f"I encountered an issue searching the internet: {str(e)}"
+            return
+        
+        if answer:
+            # Citations, HTML entities and extra whitespace are cleaned in one pass,
+            # and a long answer ends at a word boundary after 1000 characters
+            sentences = []
+            for sentence in normalize_stream([answer], limit=1000):
+                sentences.append(sentence)
+                yield sentence
+            if classify(user_input) not in self.UNCACHED_KINDS:
+                self.cache.put(user_input, ' '.join(sentences), intent=source)
+        else:
+            yield f"I searched multiple sources but couldn't find specific information about '{user_input}'. Try rephrasing or ask something more specific."
 
     def speak(self, text):
         """Convert text to speech using Windows PowerShell"""
-        # Limit text length for display
-        display_text = text[:250] + "..." if len(text) > 250 else text
-        print(f"\n🤖 ChatBot: {display_text}\n")
+        self.speak_stream([text])
+
+    def speak_stream(self, sentences):
+        """Show and speak an answer sentence by sentence, as each one is ready"""
+        print("\n🤖 ChatBot:", end="", flush=True)
+        self.speech.start()
+        shown = 0
+        for sentence in sentences:
+            # Limit text length for display
+            if shown < 250:
+                display_text = sentence if shown + len(sentence) <= 250 else sentence[:250 - shown] + "..."
+                print(f" {display_text}", end="", flush=True)
+            shown += len(sentence) + 1
+            self.speech.say(sentence)
+        print("\n")
+
+    def say_aloud(self, text):
+        """Speak text with the Windows speech synthesizer; returns once it has been said"""
+        speech_text = text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
         
-        try:
-            # Limit speech to first 500 characters
-            speech_text = text[:500] if len(text) > 500 else text
-            speech_text = speech_text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
-            
-            ps_command = f'''
+        ps_command = f'''
 Add-Type -AssemblyName System.Speech
 $synthesizer = New-Object System.Speech.Synthesis.SpeechSynthesizer
 $synthesizer.Rate = 0
 $synthesizer.Volume = 100
 $synthesizer.Speak("{speech_text}")
 '''
-            subprocess.Popen(
-                ['powershell', '-NoProfile', '-Command', ps_command],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-        except Exception as e:
-            pass
+        subprocess.run(
+            ['powershell', '-NoProfile', '-Command', ps_command],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
 
     def listen_voice(self):
         """Listen for voice input using Windows Speech Recognition"""
@@ -371,6 +408,16 @@ try {
         
         return user_input
 
+    def check_upstreams(self):
+        """Probe this bot's upstreams in the background; what is reachable is printed once known"""
+        def done(probe):
+            if probe.reachable():
+                print(f"\n✓ Internet connection detected! ({probe.report()})")
+            else:
+                print("\n⚠️  Warning: No internet connection detected!")
+                print("This chatbot needs internet to work properly.\n")
+        return HealthProbe(self.HEALTH_PROBES, on_done=done).start()
+
     def chat(self):
         """Main chat loop"""
         print(f"{'='*60}")
@@ -387,6 +434,8 @@ try {
         while True:
             try:
                 user_input = self.listen()
+                # A new turn has started - drop whatever is still being prefetched for the last one
+                self.prefetcher.cancel()
                 
                 if not user_input:
                     continue
@@ -405,8 +454,12 @@ try {
                 
                 # Get answer from internet
                 question_count += 1
-                response = self.get_response(user_input)
-                self.speak(response)
+                self.speak_stream(self.get_response_stream(user_input))
+                
+                # Use the time the answer is spoken and the next question listened for
+                if not is_follow_up(user_input):
+                    self.last_query, self.last_page, self.more_position = user_input, None, 0
+                    self.topic = self.prefetcher.start(self.prefetch_follow_ups, user_input)
                 
             except KeyboardInterrupt:
                 print("\n")
@@ -414,17 +467,26 @@ try {
                 break
             except Exception as e:
                 print(f"Error: {e}")
+        
+        self.speech.wait()
+        print(f"📊 {self.cache.report()}")
+        for line in self.runner.latency_report():
+            print(f"⏱️  {line}")
+        for line in self.breakers.report():
+            print(f"🔌 {line}")
+        print(f"🚦 {shared_limiter().report()}")
+        print(f"🧭 Questions by kind: {self.router.report()}")
+        print(f"💾 {self.answer_cache.report()}")
+        print(f"🔗 {self.flight.report()}")
+        provider_loop = ProviderLoop.started()
+        if provider_loop is not None:
+            print(f"⚡ {provider_loop.report()}")
+        print(f"🔮 {self.prefetcher.report()}")
 
 if __name__ == "__main__":
-    # Check internet connection
-    try:
-        requests.get('https://www.google.com', timeout=2)
-        print("✓ Internet connection detected!")
-    except:
-        print("⚠️  Warning: No internet connection detected!")
-        print("This chatbot needs internet to work properly.\n")
-    
     chatbot = AdvancedOnlineAIChatbot()
+    # Upstreams are checked in the background while the greeting is spoken
+    chatbot.check_upstreams()
     chatbot.chat()
     
     print("\n" + "="*60)
@@ -5,17 +5,43 @@ Uses reliable APIs that work without authentication
 """
 
 import re
-from datetime import datetime
 import subprocess
-import os
-import requests
-import json
-import wikipedia
-from urllib.parse import quote
 import time
+import functools
+from source_runner import is_acceptable
+from source_stats import SourceStats
+from answer_cache import AnswerCache, cached_source
+from singleflight import shared_flight
+from response_cache import normalize
+from swr_cache import SWRCache
+from weather_client import FORECAST_URL, WeatherClient
+from wiki_client import API_URL as WIKI_API_URL, WikiClient
+from extractors import EXTRACTORS
+from answer_stream import SpeechQueue, normalize_stream
+from circuit_breaker import BreakerBoard
+from http_session import shared_session
+from health import HealthProbe
+from rate_limit import shared_limiter
 
 class WorkingAIChatbot:
-    def __init__(self):
+    # Upstreams probed in the background at startup
+    HEALTH_PROBES = {
+        'wikipedia': WIKI_API_URL,
+        'weather': FORECAST_URL,
+        'ask': 'https://www.ask.com/',
+        'answers': 'https://www.answers.com/',
+        'wolframalpha': 'https://www.wolframalpha.com/',
+    }
+    # Seconds a source's answer stays in the on-disk cache shared across runs
+    ANSWER_TTLS = {
+        'wikipedia': 7 * 86400,
+        'weather': 600,
+        'ask': 86400,
+        'answers': 86400,
+        'wolframalpha': 86400,
+    }
+
+    def __init__(self, session=None):
         self.name = "Online AI ChatBot"
         
         print("\n" + "="*60)
@@ -30,35 +56,49 @@ class WorkingAIChatbot:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        
+        # Latency/success history that decides the order of the source cascade
+        self.source_stats = SourceStats()
+        # Pooled keep-alive connections shared by every source (and every bot in the process)
+        self.session = session or shared_session()
+        # Upstreams that keep failing are skipped until a probe finds them back up
+        self.breakers = BreakerBoard(failure_threshold=3, cooldown=60)
+        # Wikipedia searches and summaries: popular topics are served from memory
+        # and refreshed in the background once they are an hour old
+        self.wiki_cache = SWRCache(max_size=512, soft_ttl=3600, hard_ttl=7 * 86400)
+        self.wiki = WikiClient(self.session)
+        # Known cities skip geocoding; conditions are reused per grid cell for 10 minutes
+        self.weather = WeatherClient(get=functools.partial(self.breakers.call, 'weather', self.session.get))
+        self.answer_cache = AnswerCache('working', ttls=self.ANSWER_TTLS)
+        # Users asking the same question at once share one upstream lookup per source
+        self.flight = shared_flight()
+        # Sentences are spoken in order on a background thread while the rest of the answer is shown
+        self.speech = SpeechQueue(self.say_aloud, max_chars=800)
+
+    def wikipedia_lookup(self, query, timeout=5):
+        """Best Wikipedia page for `query`, served from the stale-while-revalidate cache"""
+        return self.wiki_cache.get(('lookup', normalize(query)),
+                                   lambda: self.breakers.call('wikipedia', self.wiki.lookup, query, timeout=timeout),
+                                   timeout=timeout)
 
+    @cached_source('wikipedia')
     def search_wikipedia_detailed(self, query):
         """Search Wikipedia for detailed answers"""
+        if self.breakers.is_open('wikipedia'):
+            return None
         try:
             print("  📚 Searching Wikipedia...", end=" ", flush=True)
             
-            search_results = wikipedia.search(query, results=1)
+            # Search hit and intro extract in one request; disambiguation pages are skipped
+            page = self.wikipedia_lookup(query)
             
-            if search_results:
-                try:
-                    page = wikipedia.page(search_results[0], auto_suggest=True)
-                    summary = page.summary
-                    
-                    # Get first few sentences
-                    sentences = summary.split('.')
-                    answer = '. '.join(sentences[:5]) + '.'
-                    
-                    print("✓ Found!")
-                    return answer
-                except wikipedia.exceptions.DisambiguationError as e:
-                    if e.options:
-                        page = wikipedia.page(e.options[0], auto_suggest=True)
-                        summary = page.summary
-                        sentences = summary.split('.')
-                        answer = '. '.join(sentences[:5]) + '.'
-                        print("✓ Found!")
-                        return answer
-                except:
-                    pass
+            if page:
+                # Get first few sentences
+                sentences = page.extract.split('.')
+                answer = '. '.join(sentences[:5]) + '.'
+                
+                print("✓ Found!")
+                return answer
             
             print("✗ No results")
         except Exception as e:
@@ -66,8 +106,11 @@ class WorkingAIChatbot:
         
         return None
 
+    @cached_source('ask')
     def search_knowledge_api(self, query):
         """Search using Knowledge API (free alternative)"""
+        if self.breakers.is_open('ask'):
+            return None
         try:
             print("  🧠 Searching Knowledge API...", end=" ", flush=True)
             
@@ -78,18 +121,14 @@ class WorkingAIChatbot:
                 'o': 'json'
             }
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
+            response = self.breakers.call('ask', self.session.get, url, params=params, headers=self.headers, timeout=5, stream=True)
             if response.status_code == 200:
-                text = response.text
-                # Try to extract answer
-                import re as regex
-                matches = regex.findall(r'<p[^>]*>([^<]{50,300})</p>', text)
-                if matches:
-                    for match in matches:
-                        cleaned = match.strip()
-                        if len(cleaned) > 30:
-                            print("✓ Found!")
-                            return cleaned
+                # Try to extract answer - the download stops at the first one
+                cleaned = EXTRACTORS['ask'].from_response(response)
+                if cleaned:
+                    print("✓ Found!")
+                    return cleaned
+            response.close()
             
             print("✗ No results")
         except Exception as e:
@@ -97,24 +136,25 @@ class WorkingAIChatbot:
         
         return None
 
+    @cached_source('answers')
     def search_answers_com(self, query):
         """Search using Answers.com API"""
+        if self.breakers.is_open('answers'):
+            return None
         try:
             print("  📖 Searching Answers.com...", end=" ", flush=True)
             
             url = "https://www.answers.com/search"
             params = {'q': query}
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
+            response = self.breakers.call('answers', self.session.get, url, params=params, headers=self.headers, timeout=5, stream=True)
             if response.status_code == 200:
-                import re as regex
-                # Look for answer content
-                matches = regex.findall(r'<div[^>]*class="[^"]*answer[^"]*"[^>]*>([^<]{50,300})</div>', response.text)
-                if matches:
-                    answer = matches[0].strip()
-                    if len(answer) > 30:
-                        print("✓ Found!")
-                        return answer
+                # Look for answer content - the download stops at the first one
+                answer = EXTRACTORS['answers'].from_response(response)
+                if answer:
+                    print("✓ Found!")
+                    return answer
+            response.close()
             
             print("✗ No results")
         except Exception as e:
@@ -122,24 +162,25 @@ class WorkingAIChatbot:
         
         return None
 
+    @cached_source('wolframalpha')
     def search_wolframalpha(self, query):
         """Get computational answers from Wolfram Alpha"""
+        if self.breakers.is_open('wolframalpha'):
+            return None
         try:
             print("  🔬 Searching Wolfram Alpha...", end=" ", flush=True)
             
             url = "http://www.wolframalpha.com/input/"
             params = {'i': query}
             
-            response = requests.get(url, params=params, headers=self.headers, timeout=5)
+            response = self.breakers.call('wolframalpha', self.session.get, url, params=params, headers=self.headers, timeout=5, stream=True)
             if response.status_code == 200:
-                import re as regex
-                # Look for result pod
-                matches = regex.findall(r'<div[^>]*class="pod"[^>]*>.*?<span[^>]*>([^<]{20,200})</span>', response.text, regex.DOTALL)
-                if matches:
-                    answer = matches[0].strip()
-                    if len(answer) > 10:
-                        print("✓ Found!")
-                        return answer
+                # Look for result pod - the download stops at the first one
+                answer = EXTRACTORS['wolframalpha'].from_response(response)
+                if answer:
+                    print("✓ Found!")
+                    return answer
+            response.close()
             
             print("✗ No results")
         except Exception as e:
@@ -147,45 +188,27 @@ class WorkingAIChatbot:
         
         return None
 
+    def is_weather_query(self, query):
+        return any(word in query.lower() for word in ['weather', 'temperature', 'climate', 'rain', 'wind', 'forecast'])
+
+    @cached_source('weather')
     def search_weather(self, query):
         """Get weather information"""
         try:
-            if any(word in query.lower() for word in ['weather', 'temperature', 'climate', 'rain', 'wind', 'forecast']):
+            if self.is_weather_query(query) and not self.breakers.is_open('weather'):
                 print("  🌤️  Checking Weather...", end=" ", flush=True)
                 
-                city = re.sub(r'(weather|temperature|in|climate|rain|wind|forecast|is it)', '', query.lower()).strip()
+                city = re.sub(r'\b(weather|temperature|in|climate|rain|wind|forecast|is it)\b', '', query.lower()).strip()
                 if not city:
                     city = "London"
                 
-                # Get geocoding
-                url = "https://geocoding-api.open-meteo.com/v1/search"
-                params = {'name': city, 'count': 1, 'language': 'en'}
-                
-                response = requests.get(url, params=params, timeout=5)
-                if response.status_code == 200:
-                    geo_data = response.json()
-                    if geo_data.get('results'):
-                        loc = geo_data['results'][0]
-                        lat, lon = loc['latitude'], loc['longitude']
-                        city_name = loc.get('name', 'Unknown')
-                        country = loc.get('country', '')
-                        
-                        # Get weather
-                        weather_url = "https://api.open-meteo.com/v1/forecast"
-                        weather_params = {
-                            'latitude': lat,
-                            'longitude': lon,
-                            'current': 'temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m'
-                        }
-                        
-                        w_response = requests.get(weather_url, params=weather_params, timeout=5)
-                        if w_response.status_code == 200:
-                            w_data = w_response.json()
-                            current = w_data['current']
-                            
-                            result = f"Weather in {city_name}, {country}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind: {current['wind_speed_10m']} km/h"
-                            print("✓ Found!")
-                            return result
+                loc = self.weather.locate(query, city, timeout=5)
+                if loc:
+                    current = self.weather.current(loc['latitude'], loc['longitude'], timeout=5)
+                    if current:
+                        result = f"Weather in {loc['name']}, {loc['country']}: {current['temperature_2m']}°C, Humidity: {current['relative_humidity_2m']}%, Wind: {current['wind_speed_10m']} km/h"
+                        print("✓ Found!")
+                        return result
                 
                 print("✗ No results")
         except Exception as e:
@@ -195,63 +218,82 @@ class WorkingAIChatbot:
 
     def get_response(self, user_input):
         """Get comprehensive response"""
+        return ' '.join(self.get_response_stream(user_input))
+
+    def get_response_stream(self, user_input):
+        """Yield the response as clean sentences, each as soon as it is ready"""
         try:
             print(f"\n📡 Searching for: '{user_input}'")
             print("  Checking multiple sources...")
             
-            # Try different sources
-            sources = [
-                self.search_wikipedia_detailed,
-                self.search_weather,
-                self.search_knowledge_api,
-                self.search_answers_com,
-                self.search_wolframalpha,
-            ]
+            # Try sources cheapest-first by expected time-to-answer
+            sources = {
+                'wikipedia': self.search_wikipedia_detailed,
+                'weather': self.search_weather,
+                'ask': self.search_knowledge_api,
+                'answers': self.search_answers_com,
+                'wolframalpha': self.search_wolframalpha,
+            }
             
-            for source in sources:
+            for name in self.source_stats.order(sources):
+                # Weather only applies to weather questions and an open breaker means the
+                # upstream is down - neither skip says anything about the source's speed
+                if name == 'weather' and not self.is_weather_query(user_input):
+                    continue
+                if self.breakers.is_open(name):
+                    continue
+                
+                # Upstream calls are timed inside the source; cache hits are not counted
                 try:
-                    answer = source(user_input)
-                    if answer and len(answer.strip()) > 10:
-                        # Clean answer
-                        answer = answer.strip()
-                        answer = re.sub(r'\[\d+\]', '', answer)
-                        answer = ' '.join(answer.split())
-                        
-                        if len(answer) > 1500:
-                            answer = answer[:1500] + "..."
-                        
-                        return answer
+                    answer = sources[name](user_input)
                 except Exception as e:
-                    continue
+                    answer = None
+                
+                if is_acceptable(answer):
+                    # Citations and extra whitespace are cleaned in one pass,
+                    # and a long answer ends at a word boundary after 1500 characters
+                    yield from normalize_stream([answer], limit=1500)
+                    return
             
-            return f"I couldn't find specific information about '{user_input}'. Try asking differently or be more specific."
+            yield f"I couldn't find specific information about '{user_input}'. Try asking differently or be more specific."
         
         except Exception as e:
-            return f"I encountered an issue searching: {str(e)}"
+            yield f"I encountered an issue searching: {str(e)}"
 
     def speak(self, text):
         """Convert text to speech"""
-        display_text = text[:300] + "..." if len(text) > 300 else text
-        print(f"\n🤖 ChatBot: {display_text}\n")
+        self.speak_stream([text])
+
+    def speak_stream(self, sentences):
+        """Show and speak an answer sentence by sentence, as each one is ready"""
+        print("\n🤖 ChatBot:", end="", flush=True)
+        self.speech.start()
+        shown = 0
+        for sentence in sentences:
+            # Limit text length for display
+            if shown < 300:
+                display_text = sentence if shown + len(sentence) <= 300 else sentence[:300 - shown] + "..."
+                print(f" {display_text}", end="", flush=True)
+            shown += len(sentence) + 1
+            self.speech.say(sentence)
+        print("\n")
+
+    def say_aloud(self, text):
+        """Speak text with the Windows speech synthesizer; returns once it has been said"""
+        speech_text = text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
         
-        try:
-            speech_text = text[:800] if len(text) > 800 else text
-            speech_text = speech_text.replace('"', '\"').replace('$', '`$').replace('\n', ' ')
-            
-            ps_command = f'''
+        ps_command = f'''
 Add-Type -AssemblyName System.Speech
 $synthesizer = New-Object System.Speech.Synthesis.SpeechSynthesizer
 $synthesizer.Rate = 0
 $synthesizer.Volume = 100
 $synthesizer.Speak("{speech_text}")
 '''
-            subprocess.Popen(
-                ['powershell', '-NoProfile', '-Command', ps_command],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-        except Exception as e:
-            pass
+        subprocess.run(
+            ['powershell', '-NoProfile', '-Command', ps_command],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
 
     def listen_voice(self):
         """Listen for voice input"""
@@ -309,6 +351,15 @@ try {
         
         return user_input
 
+    def check_upstreams(self):
+        """Probe this bot's upstreams in the background; what is reachable is printed once known"""
+        def done(probe):
+            if probe.reachable():
+                print(f"\n✓ Internet connection detected! ({probe.report()})")
+            else:
+                print("\n⚠️  No internet connection!")
+        return HealthProbe(self.HEALTH_PROBES, on_done=done).start()
+
     def chat(self):
         """Main chat loop"""
         print(f"{'='*60}")
@@ -336,10 +387,7 @@ try {
                     self.speak("Goodbye! Have a great day!")
                     break
                 
-                response = self.get_response(user_input)
-                self.speak(response)
-                
-                time.sleep(1)
+                self.speak_stream(self.get_response_stream(user_input))
                 
             except KeyboardInterrupt:
                 print("\n")
@@ -347,15 +395,23 @@ try {
                 break
             except Exception as e:
                 print(f"Error: {e}")
+        
+        self.speech.wait()
+        self.source_stats.save()
+        print("\n📊 Source stats:")
+        for line in self.source_stats.report():
+            print(f"  {line}")
+        for line in self.breakers.report():
+            print(f"🔌 {line}")
+        print(f"🚦 {shared_limiter().report()}")
+        print(f"💾 {self.answer_cache.report()}")
+        print(f"🔗 {self.flight.report()}")
+        print(f"💾 {self.wiki_cache.report()}")
 
 if __name__ == "__main__":
-    try:
-        requests.get('https://www.google.com', timeout=2)
-        print("✓ Internet connection detected!")
-    except:
-        print("⚠️  No internet connection!")
-    
     chatbot = WorkingAIChatbot()
+    # Upstreams are checked in the background while the greeting is spoken
+    chatbot.check_upstreams()
     chatbot.chat()
     
     print("\n" + "="*60)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker
+Per-upstream circuit breakers for the search cascades. After a run of
+consecutive failures a breaker opens and its source is skipped without
+touching the network; once the cool-down has passed a single half-open
+probe is let through, and its outcome closes or re-opens the breaker.
+"""
+
+import threading
+import time
+
+from rate_limit import RateLimited
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose breaker is open"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, cooldown=60.0):
+        """
+        failure_threshold: consecutive failures that open the breaker
+        cooldown:          seconds an open breaker waits before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.lock = threading.Lock()
+
+    def is_open(self):
+        """True while calls would be refused - does not start a probe"""
+        with self.lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                return now < self.opened_at + self.cooldown
+            if self.state == HALF_OPEN:
+                return now < self.probe_started + self.cooldown
+            return False
+
+    def allow(self):
+        """Whether a call may go out now; every allowed call must be followed by record()"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            now = time.monotonic()
+            if self.state == OPEN and now >= self.opened_at + self.cooldown:
+                self.state = HALF_OPEN
+                self.probe_started = now
+                return True
+            # A probe that never reported back is given up on after another cool-down
+            if self.state == HALF_OPEN and now >= self.probe_started + self.cooldown:
+                self.probe_started = now
+                return True
+            return False
+
+    def cancel(self):
+        """An allowed call never went out - a half-open probe slot goes to the next call"""
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+                self.opened_at = time.monotonic() - self.cooldown
+
+    def record(self, ok):
+        """Report the outcome of an allowed call"""
+        with self.lock:
+            if ok:
+                self.state = CLOSED
+                self.failures = 0
+                return
+
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class BreakerBoard:
+    """The breakers of one bot, created on first use and keyed by source name"""
+
+    def __init__(self, failure_threshold=3, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.breakers = {}
+        self.lock = threading.Lock()
+        # Per-thread count of calls refused or failed, see unavailable_count()
+        self.local = threading.local()
+
+    def __getitem__(self, name):
+        with self.lock:
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = self.breakers[name] = CircuitBreaker(name, self.failure_threshold, self.cooldown)
+            return breaker
+
+    def allow(self, name):
+        return self[name].allow()
+
+    def record(self, name, ok):
+        self[name].record(ok)
+
+    def is_open(self, name):
+        if self[name].is_open():
+            self._note_unavailable()
+            return True
+        return False
+
+    def _note_unavailable(self):
+        self.local.unavailable = getattr(self.local, 'unavailable', 0) + 1
+
+    def unavailable_count(self):
+        """How many calls this thread has had refused or failed so far; compare it
+        before and after a lookup to tell an empty result from an upstream outage"""
+        return getattr(self.local, 'unavailable', 0)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Call func(*args, **kwargs) through the breaker `name`.
+        Raises CircuitOpenError while the breaker is open. An exception or
+        an HTTP error status (a result with status_code >= 400) counts as
+        a failure; anything else as a success. RateLimited is our own
+        throttling, so it leaves the breaker as it was.
+        """
+        breaker = self[name]
+        if not breaker.allow():
+            self._note_unavailable()
+            raise CircuitOpenError(name)
+        try:
+            result = func(*args, **kwargs)
+        except RateLimited:
+            breaker.cancel()
+            self._note_unavailable()
+            raise
+        except Exception:
+            breaker.record(False)
+            self._note_unavailable()
+            raise
+        ok = getattr(result, 'status_code', 200) < 400
+        breaker.record(ok)
+        if not ok:
+            self._note_unavailable()
+        return result
+
+    def states(self):
+        """{source name: 'closed' | 'open' | 'half-open'}"""
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.state for breaker in breakers}
+
+    def report(self):
+        return [
+            f"{name}: {state}" + (f" ({self[name].failures} failures)" if state != CLOSED else "")
+            for name, state in sorted(self.states().items())
+        ]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Extractors
+One registry of per-source answer extractors, compiled once at import.
+Every source that scrapes or parses a response looks its extractor up
+here instead of compiling regexes inline, so parser changes can be
+benchmarked and regression-tested offline against the saved result pages
+in benchmarks/fixtures/ (python -m benchmarks.bench_extractors).
+"""
+
+import html
+import json
+import re
+
+from html_extract import extract_first
+
+
+class PatternExtractor:
+    """First group(1) of the first matching pattern in an HTML results page"""
+
+    kind = 'html'
+
+    def __init__(self, name, patterns, min_length=30, flags=0, reject=None):
+        """
+        patterns:   regexes in order of preference, each capturing the snippet;
+                    a match may be at most html_extract.LOOKAHEAD long
+        min_length: a snippet must be longer than this to count
+        reject:     optional predicate for snippets to skip
+        """
+        self.name = name
+        self.patterns = [re.compile(pattern, flags) for pattern in patterns]
+        self.min_length = min_length
+        self.reject = reject
+
+    def accept(self, snippet):
+        snippet = html.unescape(snippet)
+        return len(snippet) > self.min_length and not (self.reject and self.reject(snippet))
+
+    def from_text(self, text):
+        """The snippet in a whole page, or None"""
+        for pattern in self.patterns:
+            for match in pattern.finditer(text):
+                snippet = match.group(1).strip()
+                if self.accept(snippet):
+                    return html.unescape(snippet)
+        return None
+
+    def from_response(self, response):
+        """The snippet in a stream=True response, read only as far as needed"""
+        snippet = extract_first(response, self.patterns, accept=self.accept)
+        return html.unescape(snippet) if snippet else None
+
+
+class FunctionExtractor:
+    """An answer parsed out of a JSON or plain-text body by a function"""
+
+    def __init__(self, name, parse, kind='json', min_length=0):
+        self.name = name
+        self.parse = parse
+        self.kind = kind
+        self.min_length = min_length
+
+    def _checked(self, answer):
+        return answer if answer and len(answer) > self.min_length else None
+
+    def from_text(self, text):
+        return self._checked(self.parse(json.loads(text) if self.kind == 'json' else text))
+
+    def from_response(self, response):
+        return self._checked(self.parse(response.json() if self.kind == 'json' else response.text))
+
+
+def parse_duckduckgo(data):
+    """Instant answer: the abstract, else the direct answer, else the first related topic"""
+    if data.get('AbstractText'):
+        return data['AbstractText']
+    if data.get('Answer'):
+        return data['Answer']
+    topics = data.get('RelatedTopics') or []
+    if topics and topics[0].get('Text'):
+        return topics[0]['Text']
+    return None
+
+
+def parse_jina(text):
+    """Jina Reader returns the page as plain text - the top of it is the answer"""
+    return text[:500].strip()
+
+
+EXTRACTORS = {extractor.name: extractor for extractor in [
+    # Google results page: knowledge panel first, then the featured snippet
+    PatternExtractor('google', [
+        r'<span[^>]*>([^<]{100,500})</span>',
+        r'<span[^>]*class="[^"]*snippet[^"]*"[^>]*>([^<]{50,300})</span>',
+    ]),
+    # Any sizeable span on a Google results page
+    PatternExtractor('google_span', [r'<span[^>]*>([^<]{50,300})</span>'],
+                     reject=lambda snippet: snippet.startswith('<')),
+    PatternExtractor('ask', [r'<p[^>]*>([^<]{50,300})</p>']),
+    PatternExtractor('answers', [r'<div[^>]*class="[^"]*answer[^"]*"[^>]*>([^<]{50,300})</div>']),
+    PatternExtractor('wolframalpha', [r'<div[^>]*class="pod"[^>]*>.{0,4000}?<span[^>]*>([^<]{20,200})</span>'],
+                     min_length=10, flags=re.DOTALL),
+    FunctionExtractor('duckduckgo', parse_duckduckgo),
+    FunctionExtractor('jina', parse_jina, kind='text', min_length=30),
+]}
+
+
+def get_extractor(name):
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise KeyError(f"No extractor named {name!r} (have: {', '.join(sorted(EXTRACTORS))})") from None
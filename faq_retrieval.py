@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+FAQ Retrieval
+Local TF-IDF search over an FAQ/document corpus. The index is built
+offline into .npy files (term-major sparse matrix + answer text) that
+are memory-mapped at startup, so loading costs almost nothing and a
+query only touches the postings of its own terms.
+
+Build the index:
+    python faq_retrieval.py build faq/corpus.json
+Query it:
+    python faq_retrieval.py search "how do vaccines work"
+"""
+
+import json
+import math
+import os
+import re
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Retrieval is optional - bots fall back to canned answers
+    np = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(BASE_DIR, 'faq', 'corpus.json')
+INDEX_DIR = os.path.join(BASE_DIR, '.faq_index')
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'do', 'does', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'that', 'the',
+    'this', 'to', 'was', 'what', 'when', 'where', 'which', 'who', 'why', 'with',
+    'you', 'your', 'tell', 'about',
+}
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def load_corpus(path):
+    """Read a corpus: a JSON list of {"question", "answer"} or {"text"} entries"""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    documents = []
+    for entry in entries:
+        if isinstance(entry, str):
+            documents.append((entry, entry))
+        elif 'answer' in entry:
+            documents.append((f"{entry.get('question', '')} {entry['answer']}", entry['answer']))
+        else:
+            documents.append((entry['text'], entry['text']))
+    return documents
+
+
+def build_index(documents, index_dir=INDEX_DIR):
+    """Build the TF-IDF index for (text, answer) pairs and save it to `index_dir`"""
+    if np is None:
+        raise ImportError("numpy is required to build the FAQ index (pip install numpy)")
+
+    vocabulary = {}
+    postings = []  # per term: list of (doc, count)
+
+    for doc_id, (text, _) in enumerate(documents):
+        counts = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            term_id = vocabulary.get(token)
+            if term_id is None:
+                term_id = vocabulary[token] = len(postings)
+                postings.append([])
+            postings[term_id].append((doc_id, count))
+
+    doc_count = len(documents)
+    idf = np.array([math.log((1 + doc_count) / (1 + len(p))) + 1 for p in postings], dtype=np.float32)
+
+    # Term-major (CSC-style) layout: a query reads only its own terms' rows
+    indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(p) for p in postings])
+    doc_ids = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float32)
+    for term_id, plist in enumerate(postings):
+        start = indptr[term_id]
+        for offset, (doc_id, count) in enumerate(plist):
+            doc_ids[start + offset] = doc_id
+            weights[start + offset] = (1 + math.log(count)) * idf[term_id]
+
+    # L2-normalize each document vector so dot products are cosine similarities
+    norms = np.bincount(doc_ids, weights=weights.astype(np.float64) ** 2, minlength=doc_count)
+    norms = np.sqrt(norms).astype(np.float32)
+    norms[norms == 0] = 1
+    weights /= norms[doc_ids]
+
+    # Answers are stored as one UTF-8 blob plus offsets so they can be memory-mapped too
+    encoded = [answer.encode('utf-8') for _, answer in documents]
+    answer_offsets = np.zeros(doc_count + 1, dtype=np.int64)
+    answer_offsets[1:] = np.cumsum([len(answer) for answer in encoded])
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, 'indptr.npy'), indptr)
+    np.save(os.path.join(index_dir, 'doc_ids.npy'), doc_ids)
+    np.save(os.path.join(index_dir, 'weights.npy'), weights)
+    np.save(os.path.join(index_dir, 'idf.npy'), idf)
+    np.save(os.path.join(index_dir, 'answer_offsets.npy'), answer_offsets)
+    with open(os.path.join(index_dir, 'answers.bin'), 'wb') as f:
+        for answer in encoded:
+            f.write(answer)
+    with open(os.path.join(index_dir, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+        json.dump({'documents': doc_count, 'terms': vocabulary}, f)
+
+
+class FaqIndex:
+    # Cosine similarity an answer needs before it is used instead of a canned reply
+    MIN_SCORE = 0.35
+
+    def __init__(self, index_dir=INDEX_DIR):
+        """Memory-map a built index"""
+        def mapped(name):
+            return np.load(os.path.join(index_dir, name), mmap_mode='r')
+
+        self.indptr = mapped('indptr.npy')
+        self.doc_ids = mapped('doc_ids.npy')
+        self.weights = mapped('weights.npy')
+        self.idf = mapped('idf.npy')
+        self.answer_offsets = mapped('answer_offsets.npy')
+        self.answers = np.memmap(os.path.join(index_dir, 'answers.bin'), dtype=np.uint8, mode='r') \
+            if self.answer_offsets[-1] else np.zeros(0, dtype=np.uint8)
+
+        with open(os.path.join(index_dir, 'vocabulary.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.document_count = meta['documents']
+        self.vocabulary = meta['terms']
+
+    def __len__(self):
+        return self.document_count
+
+    def answer(self, doc_id):
+        start, end = self.answer_offsets[doc_id], self.answer_offsets[doc_id + 1]
+        return bytes(self.answers[start:end]).decode('utf-8')
+
+    def search(self, query, k=3):
+        """Return up to k (answer, score) pairs, best first"""
+        counts = {}
+        for token in tokenize(query):
+            term_id = self.vocabulary.get(token)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if not counts:
+            return []
+
+        query_weights = {term_id: (1 + math.log(count)) * float(self.idf[term_id])
+                         for term_id, count in counts.items()}
+        query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values()))
+
+        # Accumulate scores only over documents sharing a term with the query
+        hit_docs = []
+        hit_scores = []
+        for term_id, weight in query_weights.items():
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            hit_docs.append(self.doc_ids[start:end])
+            hit_scores.append(self.weights[start:end] * (weight / query_norm))
+
+        docs = np.concatenate(hit_docs)
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(hit_scores))
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.answer(int(candidates[i])), float(scores[i])) for i in top]
+
+    def best_answer(self, query):
+        """Return the best answer if it is similar enough, otherwise None"""
+        hits = self.search(query, k=1)
+        if hits and hits[0][1] >= self.MIN_SCORE:
+            return hits[0][0]
+        return None
+
+
+def load_faq_index(corpus_path=CORPUS_PATH, index_dir=INDEX_DIR):
+    """Load the FAQ index, building it first if the corpus is newer; None if unavailable"""
+    if np is None:
+        return None
+
+    try:
+        index_file = os.path.join(index_dir, 'vocabulary.json')
+        if os.path.exists(corpus_path) and (
+                not os.path.exists(index_file) or os.path.getmtime(index_file) < os.path.getmtime(corpus_path)):
+            print("📚 Building FAQ index...")
+            build_index(load_corpus(corpus_path), index_dir)
+        if not os.path.exists(index_file):
+            return None
+        return FaqIndex(index_dir)
+    except Exception as e:
+        print(f"⚠️  FAQ index unavailable: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == 'build':
+        corpus = sys.argv[2] if len(sys.argv) > 2 else CORPUS_PATH
+        start = time.perf_counter()
+        documents = load_corpus(corpus)
+        build_index(documents)
+        print(f"✓ Indexed {len(documents)} documents in {time.perf_counter() - start:.2f}s")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'search':
+        index = load_faq_index()
+        if index is None:
+            print("No FAQ index - run: python faq_retrieval.py build faq/corpus.json")
+        else:
+            for answer, score in index.search(' '.join(sys.argv[2:])):
+                print(f"{score:.3f}  {answer}")
+    else:
+        print(__doc__)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Gazetteer
+Offline city lookup for weather questions. City names are compiled into
+a token trie (cached as a pickle next to the intent packs) and matched
+against the question, so a known city comes with its coordinates and the
+geocoding request is skipped.
+
+The bundled gazetteer/cities.tsv covers major world cities. Dropping
+GeoNames' cities15000.txt (https://download.geonames.org/export/dump/)
+into gazetteer/ makes it the source instead.
+
+Try it:
+    python gazetteer.py "what's the weather in rio de janeiro today"
+"""
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+import unicodedata
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GAZETTEER_DIR = os.path.join(BASE_DIR, 'gazetteer')
+CACHE_DIR = os.path.join(BASE_DIR, '.intent_cache')
+SOURCES = ['cities15000.txt', 'cities.tsv']
+CACHE_VERSION = 1
+
+TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# City names that are also everyday words only count right after a preposition
+COMMON_WORDS = {
+    'weather', 'forecast', 'rain', 'wind', 'snow', 'hot', 'cold', 'warm', 'nice',
+    'today', 'tomorrow', 'now', 'like', 'the', 'is', 'it', 'what', 'how', 'march',
+    'mobile', 'reading', 'bath', 'split', 'sale', 'best', 'deal', 'hope', 'ely',
+}
+PREPOSITIONS = {'in', 'at', 'for', 'of', 'near', 'around'}
+
+
+def tokenize(text):
+    """Lower-case ASCII word tokens - accents are folded so 'São Paulo' matches 'sao paulo'"""
+    folded = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return TOKEN_RE.findall(folded.lower())
+
+
+def read_places(path):
+    """
+    Read (names, place) pairs from a GeoNames dump (19 tab-separated
+    columns) or a bundled TSV of name, country, latitude, longitude,
+    population. A place is (name, country, latitude, longitude, population).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            columns = line.rstrip('\n').split('\t')
+            if len(columns) >= 19:
+                names = {columns[1], columns[2]}
+                place = (columns[1], columns[8], float(columns[4]), float(columns[5]), int(columns[14] or 0))
+            else:
+                names = {columns[0]}
+                place = (columns[0], columns[1], float(columns[2]), float(columns[3]), int(columns[4]))
+            yield names, place
+
+
+def build_trie(pairs):
+    """Token trie: {token: {token: ..., None: place}} keeping the most populous place per name"""
+    trie = {}
+    for names, place in pairs:
+        for name in names:
+            tokens = tokenize(name)
+            if not tokens:
+                continue
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            current = node.get(None)
+            if current is None or place[4] > current[4]:
+                node[None] = place
+    return trie
+
+
+class Gazetteer:
+    def __init__(self, trie):
+        self.trie = trie
+
+    def find(self, text):
+        """
+        Return {'name', 'country', 'latitude', 'longitude'} for the city
+        named in `text`, or None. The longest name wins, then the larger city.
+        """
+        tokens = tokenize(text)
+        best = None
+        for start in range(len(tokens)):
+            node = self.trie
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                place = node.get(None)
+                if place is None:
+                    continue
+                if end == start and tokens[start] in COMMON_WORDS and \
+                        (start == 0 or tokens[start - 1] not in PREPOSITIONS):
+                    continue
+                rank = (end - start + 1, place[4])
+                if best is None or rank > best[0]:
+                    best = (rank, place)
+
+        if best is None:
+            return None
+        name, country, latitude, longitude, _ = best[1]
+        return {'name': name, 'country': country, 'latitude': latitude, 'longitude': longitude}
+
+
+def source_path(directory=GAZETTEER_DIR):
+    for name in SOURCES:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_gazetteer(path=None, cache_dir=CACHE_DIR):
+    """Load the compiled gazetteer, compiling and caching it first if needed; None if unavailable"""
+    path = path or source_path()
+    if path is None:
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f"v{CACHE_VERSION}:".encode() + f.read()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"gazetteer-{digest[:16]}.pickle")
+
+        try:
+            with open(cache_path, 'rb') as f:
+                return Gazetteer(pickle.load(f))
+        except Exception:
+            pass
+
+        trie = build_trie(read_places(path))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(trie, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+
+            # Drop compiled copies of older gazetteers
+            for entry in os.listdir(cache_dir):
+                if entry.startswith('gazetteer-') and entry.endswith('.pickle') and entry != os.path.basename(cache_path):
+                    os.remove(os.path.join(cache_dir, entry))
+        except OSError as e:
+            print(f"⚠️  Could not cache gazetteer: {e}")
+        return Gazetteer(trie)
+    except Exception as e:
+        print(f"⚠️  Gazetteer unavailable: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    gazetteer = load_gazetteer()
+    if gazetteer is None:
+        print("No gazetteer source found in gazetteer/")
+    else:
+        for query in sys.argv[1:] or ["weather in Berlin", "is it raining in sao paulo", "forecast for new york tomorrow"]:
+            print(f"{query!r} -> {gazetteer.find(query)}")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Health
+Background reachability probes of the upstreams a bot actually uses.
+All probes run at once on their own threads while the bot greets the
+user, instead of one blocking request to google.com before it starts.
+"""
+
+import threading
+import time
+
+from http_session import probe_session
+
+
+class HealthProbe:
+    def __init__(self, targets, session=None, timeout=2, on_done=None):
+        """
+        targets: {source name: URL to probe}
+        session: defaults to the unthrottled probe session - probes must not
+                 take tokens from the upstreams' rate limits
+        timeout: seconds each probe may take
+        on_done: called with this probe once every target has answered or failed
+        """
+        self.targets = dict(targets)
+        self.session = session or probe_session()
+        self.timeout = timeout
+        self.on_done = on_done
+        self.results = {}  # name -> (reachable, seconds)
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def start(self):
+        for name, url in self.targets.items():
+            threading.Thread(target=self._probe, args=(name, url), name=f'probe-{name}', daemon=True).start()
+        if not self.targets:
+            self.done.set()
+        return self
+
+    def _probe(self, name, url):
+        start = time.perf_counter()
+        try:
+            # Any HTTP answer means the upstream is reachable - the body is never read
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+            response.close()
+            reachable = response.status_code < 500
+        except Exception:
+            reachable = False
+        with self.lock:
+            self.results[name] = (reachable, time.perf_counter() - start)
+            finished = len(self.results) == len(self.targets)
+        if finished:
+            self.done.set()
+            if self.on_done is not None:
+                self.on_done(self)
+
+    def wait(self, timeout=None):
+        """Block until every probe has finished; False on timeout"""
+        return self.done.wait(timeout)
+
+    def reachable(self):
+        with self.lock:
+            return sorted(name for name, (ok, _) in self.results.items() if ok)
+
+    def report(self):
+        with self.lock:
+            results = sorted(self.results.items())
+        return ', '.join(f"{name} {'✓' if ok else '✗'} {seconds * 1000:.0f}ms" for name, (ok, seconds) in results)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HTML Extract
+Pulls the first qualifying snippet out of a results page while it is
+still downloading. The body is read in chunks and scanned incrementally,
+and the download stops as soon as a snippet is found or a byte cap is
+reached, instead of fetching the whole page and running findall over it.
+"""
+
+import codecs
+
+# Bytes read from one page at most
+MAX_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+# Longest match a pattern may produce; text this close to the end of the
+# buffer is rescanned once more data has arrived, anything before it is
+# dropped. Patterns must be bounded to fit: a gap that spans markup is
+# written as .{0,4000}? rather than .*? (a single tag's [^>]* is assumed
+# to fit), or a match longer than this is missed while streaming.
+LOOKAHEAD = 8 * 1024
+
+
+class StreamScanner:
+    """Incremental finditer: reports matches in document order as text arrives
+    (the same matches as finditer over the whole text for patterns whose
+    matches are never longer than `lookahead`)"""
+
+    def __init__(self, pattern, lookahead=LOOKAHEAD):
+        self.pattern = pattern
+        self.lookahead = lookahead
+        self.buffer = ''
+
+    def feed(self, text, final=False):
+        """Yield every match that is complete given the text seen so far"""
+        self.buffer += text
+        position = 0
+        limit = len(self.buffer) if final else len(self.buffer) - self.lookahead
+        for match in self.pattern.finditer(self.buffer):
+            # A match near the end might still grow with the next chunk
+            if match.end() > limit and not final:
+                position = match.start()
+                break
+            yield match
+            position = match.end()
+        else:
+            position = max(position, limit)
+        self.buffer = self.buffer[max(position, 0):]
+
+
+def extract_first(response, patterns, accept=None, max_bytes=MAX_BYTES, chunk_size=CHUNK_SIZE):
+    """
+    Return the first group(1) of `patterns` in a streamed response
+    (requested with stream=True) that passes accept(snippet), or None.
+
+    Patterns are in order of preference, as if each were run over the
+    whole page in turn: a match of the first pattern ends the download at
+    once, a match of a later one is kept while reading on in case an
+    earlier pattern matches further down. The response is always closed.
+    """
+    scanners = [StreamScanner(pattern) for pattern in patterns]
+    found = [None] * len(patterns)
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    received = 0
+
+    def scan(text, final=False):
+        for index, scanner in enumerate(scanners):
+            if found[index] is not None or any(found[:index]):
+                continue
+            for match in scanner.feed(text, final):
+                snippet = match.group(1).strip()
+                if accept is None or accept(snippet):
+                    found[index] = snippet
+                    break
+        return found[0] is not None
+
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            received += len(chunk)
+            if scan(decoder.decode(chunk)) or received >= max_bytes:
+                break
+        else:
+            scan(decoder.decode(b'', final=True), final=True)
+        if found[0] is None:
+            scan('', final=True)
+    finally:
+        response.close()
+
+    return next((snippet for snippet in found if snippet is not None), None)
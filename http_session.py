@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+HTTP Session
+One pooled requests.Session shared by every bot in the process, so
+repeated calls to the same upstream reuse a kept-alive connection
+instead of paying a TCP and TLS handshake each time, and holding
+requests back only when an upstream's rate limit calls for it.
+
+requests is imported when the first session is built rather than with
+this module, so a bot can start up and greet before it has loaded.
+"""
+
+import functools
+import threading
+
+from rate_limit import shared_limiter, timeout_seconds
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+_shared = None
+_probe = None
+_shared_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def rate_limited_adapter():
+    """The RateLimitedAdapter class - defined on first use, as it needs requests"""
+    from requests.adapters import HTTPAdapter
+
+    class RateLimitedAdapter(HTTPAdapter):
+        """HTTPAdapter that takes a token from the upstream's bucket before each request"""
+
+        def __init__(self, limiter=None, **kwargs):
+            self.limiter = limiter
+            super().__init__(**kwargs)
+
+        def send(self, request, **kwargs):
+            if self.limiter is not None:
+                self.limiter.acquire(request.url, max_wait=timeout_seconds(kwargs.get('timeout')))
+            return super().send(request, **kwargs)
+
+    return RateLimitedAdapter
+
+
+def make_session(pool_connections=16, pool_maxsize=16, retries=1, backoff_factor=0.3, limiter=None):
+    """
+    A Session with a tuned connection pool and retry policy.
+
+    pool_connections: hosts whose connections are kept alive
+    pool_maxsize:     connections kept per host - at least the number of
+                      source threads that may hit one host at once
+    retries:          retries of failed connects and 502/503/504 on GET,
+                      spaced by backoff_factor * 2**n seconds; read timeouts
+                      are not retried, the caller's timeout stays the bound
+    limiter:          HostRateLimiter applied to every request; a request
+                      that would wait longer than its timeout raises RateLimited
+    """
+    import requests
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+    )
+    adapter = rate_limited_adapter()(limiter, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                     max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def _shared_session():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = make_session(limiter=shared_limiter())
+        return _shared
+
+
+def _probe_session():
+    global _probe
+    with _shared_lock:
+        if _probe is None:
+            _probe = make_session(pool_maxsize=4, retries=0)
+        return _probe
+
+
+class LazySession:
+    """Stands in for a process-wide session; the real one is built on the first request"""
+
+    def __init__(self, build):
+        self.build = build
+
+    def get(self, *args, **kwargs):
+        return self.build().get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.build(), name)
+
+
+_lazy = LazySession(_shared_session)
+_lazy_probe = LazySession(_probe_session)
+
+
+def shared_session():
+    """The process-wide pooled session - building it (and importing requests) waits for the first request"""
+    return _lazy
+
+
+def probe_session():
+    """The session for health checks: no rate limiter and no retries, so a
+    probe never spends a request an upstream's allowance has room for"""
+    return _lazy_probe
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Intent Matcher
+Classifies a user message against a whole table of regex intents by
+checking only the intents whose required keywords occur in it, instead
+of one re.search call per pattern
+"""
+
+import re
+
+from keyword_index import AhoCorasick, required_keywords
+
+
+class IndexedIntentMatcher:
+    def __init__(self, intents):
+        """Build the matcher from (pattern, value) pairs in priority order"""
+        self.patterns = []
+        self.values = []
+        # Regexes are compiled the first time an intent becomes a candidate
+        self.compiled = {}
+        # Intents with no usable keyword are always regex-checked
+        self.unindexed = []
+        self.index = AhoCorasick()
+
+        for position, (pattern, value) in enumerate(intents):
+            self.patterns.append(pattern)
+            self.values.append(value)
+
+            keywords = required_keywords(pattern)
+            if keywords is None:
+                self.unindexed.append(position)
+            else:
+                for keyword in keywords:
+                    self.index.add(keyword, position)
+
+        self.index.build()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def match_index(self, text):
+        """Return the table index of the first matching intent, or None"""
+        candidates = self.index.search(text)
+        candidates.update(self.unindexed)
+
+        for position in sorted(candidates):
+            regex = self.compiled.get(position)
+            if regex is None:
+                regex = self.compiled[position] = re.compile(self.patterns[position])
+            if regex.search(text):
+                return position
+
+        return None
+
+    def match(self, text):
+        """Return the (pattern, value) pair of the first matching intent, or None"""
+        index = self.match_index(text)
+        if index is None:
+            return None
+        return self.patterns[index], self.values[index]
+
+    def lookup(self, text, default=None):
+        """Return the value of the first matching intent"""
+        index = self.match_index(text)
+        if index is None:
+            return default
+        return self.values[index]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Intent Packs
+Loads intent tables from JSON/YAML files in the intents/ folder, compiles
+them into an IndexedIntentMatcher, caches the compiled form on disk keyed
+by content hash, and hot-reloads a pack when its file changes
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import string
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+from intent_matcher import IndexedIntentMatcher
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INTENTS_DIR = os.path.join(BASE_DIR, 'intents')
+CACHE_DIR = os.path.join(BASE_DIR, '.intent_cache')
+
+# Bump when the compiled format changes so stale cache files are ignored
+CACHE_VERSION = 2
+
+# Template fields whose value changes over time - answers using them are dynamic
+DYNAMIC_FIELDS = {'now', 'period'}
+
+# ttl: seconds a rendered answer may be memoized (None = cache default)
+Intent = namedtuple('Intent', ['pattern', 'responses', 'dynamic', 'ttl'], defaults=(None,))
+
+
+def _template_fields(template):
+    return {field for _, field, _, _ in string.Formatter().parse(template) if field}
+
+
+def parse_pack(data, path):
+    """Parse raw pack data into a list of Intents"""
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(f"PyYAML is required to load {path} (pip install pyyaml)")
+        pack = yaml.safe_load(data)
+    else:
+        pack = json.loads(data)
+
+    intents = []
+    for entry in pack.get('intents', []):
+        responses = list(entry.get('responses', []))
+        fields = set()
+        for response in responses:
+            fields |= _template_fields(response)
+        dynamic = bool(entry.get('dynamic')) or bool(fields & DYNAMIC_FIELDS)
+        intents.append(Intent(entry['pattern'], responses, dynamic, entry.get('ttl')))
+    return intents
+
+
+def compile_pack(path, cache_dir=CACHE_DIR):
+    """Return the compiled matcher for a pack file, using the disk cache when possible"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    digest = hashlib.sha256(f"v{CACHE_VERSION}:".encode() + data).hexdigest()
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{digest[:16]}.pickle")
+
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
+    intents = parse_pack(data.decode('utf-8'), path)
+    matcher = IndexedIntentMatcher((intent.pattern, intent) for intent in intents)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temp file first so other processes never read half a file
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+
+        # Drop compiled copies of older versions of this pack
+        for entry in os.listdir(cache_dir):
+            if entry.startswith(f"{name}-") and entry.endswith('.pickle') and entry != os.path.basename(cache_path):
+                os.remove(os.path.join(cache_dir, entry))
+    except OSError as e:
+        print(f"⚠️  Could not cache intent pack {name}: {e}")
+
+    return matcher
+
+
+# Matcher used by batch worker processes, sent once when each worker starts
+_worker_matcher = None
+
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _classify_chunk(texts):
+    """Classify a chunk of texts in a worker, returning intent indices"""
+    match_index = _worker_matcher.match_index
+    return [match_index(text) for text in texts]
+
+
+class IntentPack:
+    # Seconds between checks of the pack file's modification time
+    RELOAD_INTERVAL = 1.0
+
+    def __init__(self, path, cache_dir=CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.mtime = os.path.getmtime(path)
+        self.checked_at = time.monotonic()
+        self.matcher = compile_pack(path, cache_dir)
+
+    def reload_if_changed(self):
+        """Recompile the pack if its file changed since it was loaded"""
+        now = time.monotonic()
+        if now - self.checked_at < self.RELOAD_INTERVAL:
+            return False
+        self.checked_at = now
+
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self.mtime:
+                return False
+            self.matcher = compile_pack(self.path, self.cache_dir)
+            self.mtime = mtime
+            print(f"🔄 Reloaded intent pack: {os.path.basename(self.path)}")
+            return True
+        except Exception as e:
+            # Keep serving the old pack until the file is fixed
+            print(f"⚠️  Intent pack reload failed: {e}")
+            return False
+
+    def lookup(self, text):
+        """Return the first Intent matching `text`, or None"""
+        self.reload_if_changed()
+        return self.matcher.lookup(text)
+
+    def classify_many(self, texts, workers=None, chunk_size=2000):
+        """Yield the matching Intent (or None) for each text, in order"""
+        self.reload_if_changed()
+        matcher = self.matcher
+
+        if not workers or workers <= 1:
+            lookup = matcher.lookup
+            for text in texts:
+                yield lookup(text)
+            return
+
+        # Large batches are split into chunks and classified on a process
+        # pool. Every worker gets this exact compiled matcher, so indices
+        # always line up even if the pack file changes mid-batch.
+        values = matcher.values
+        texts = iter(texts)
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(matcher,)) as executor:
+            pending = deque()
+            for chunk in iter(lambda: list(islice(texts, chunk_size)), []):
+                pending.append(executor.submit(_classify_chunk, chunk))
+                # Keep a bounded number of chunks in flight so huge inputs stream
+                if len(pending) >= workers * 2:
+                    for index in pending.popleft().result():
+                        yield None if index is None else values[index]
+
+            while pending:
+                for index in pending.popleft().result():
+                    yield None if index is None else values[index]
+
+    def render(self, intent, **context):
+        """Fill the intent's first response template from `context`"""
+        if not intent.responses:
+            return "I don't know how to respond."
+
+        template = intent.responses[0]
+        fields = _template_fields(template)
+        if not fields:
+            return template
+
+        # Context values may be callables so they are only computed when used
+        context.setdefault('now', datetime.now)
+        values = {key: value() if callable(value) else value
+                  for key, value in context.items() if key in fields}
+        return template.format(**values)
+
+    def respond(self, text, **context):
+        """Return the rendered answer for `text`, or None if no intent matches"""
+        intent = self.lookup(text)
+        if intent is None:
+            return None
+        return self.render(intent, **context)
+
+
+def load_pack(name, intents_dir=INTENTS_DIR):
+    """Load intents/<name>.json (or .yaml/.yml)"""
+    for extension in ('.json', '.yaml', '.yml'):
+        path = os.path.join(intents_dir, name + extension)
+        if os.path.exists(path):
+            return IntentPack(path)
+    raise FileNotFoundError(f"No intent pack named '{name}' in {intents_dir}")
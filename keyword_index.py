@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Keyword Index
+Aho-Corasick automaton over the literal text that regex intents require,
+so only intents whose keywords occur in a message need a regex check
+"""
+
+import re
+from collections import deque
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# Give up on expanding alternatives beyond this many literal strings
+MAX_ALTERNATIVES = 64
+
+
+def _expand(items):
+    """Return every literal string `items` can match, or None if not purely literal"""
+    results = ['']
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            options = [chr(av)]
+        elif op is sre_constants.AT:
+            continue
+        elif op is sre_constants.SUBPATTERN:
+            if av[1] & re.IGNORECASE:
+                return None
+            options = _expand(av[-1])
+        elif op is sre_constants.BRANCH:
+            options = []
+            for branch in av[1]:
+                expanded = _expand(branch)
+                if expanded is None:
+                    return None
+                options.extend(expanded)
+        elif op is sre_constants.IN:
+            if any(sub_op is not sre_constants.LITERAL for sub_op, _ in av):
+                return None
+            options = [chr(sub_av) for _, sub_av in av]
+        else:
+            return None
+
+        if options is None:
+            return None
+        results = [head + tail for head in results for tail in options]
+        if len(results) > MAX_ALTERNATIVES:
+            return None
+
+    return results
+
+
+def _usable(keywords):
+    return keywords is not None and all(keywords)
+
+
+def _score(keywords):
+    return min(len(keyword) for keyword in keywords)
+
+
+def _keywords(items):
+    """Pick the most selective keyword set that every match of `items` must contain"""
+    expanded = _expand(items)
+    if expanded is not None:
+        return expanded if _usable(expanded) else None
+
+    best = None
+    segment = []
+
+    def consider(candidate):
+        nonlocal best
+        if _usable(candidate) and (best is None or _score(candidate) > _score(best)):
+            best = candidate
+
+    for op, av in list(items) + [(None, None)]:
+        if op is not None and _expand([(op, av)]) is not None:
+            segment.append((op, av))
+            continue
+
+        # A non-literal item ends the current run of literal text
+        if segment:
+            consider(_expand(segment))
+            segment = []
+
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            consider(_keywords(av[2]))
+        elif op is sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:
+            consider(_keywords(av[-1]))
+        elif op is sre_constants.BRANCH:
+            options = []
+            for branch in av[1]:
+                keywords = _keywords(branch)
+                if not _usable(keywords):
+                    options = None
+                    break
+                options.extend(keywords)
+            consider(options)
+
+    return best
+
+
+def required_keywords(pattern):
+    """Return literal strings of which every match of `pattern` contains one, or None"""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+
+    keywords = _keywords(parsed)
+    return sorted(set(keywords)) if keywords else None
+
+
+class AhoCorasick:
+    def __init__(self):
+        """Empty automaton - call add() for each keyword, then build()"""
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.built = False
+
+    def add(self, keyword, value):
+        """Report `value` whenever `keyword` occurs in searched text"""
+        state = 0
+        for char in keyword:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append(value)
+        self.built = False
+
+    def build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        self.built = True
+
+    def search(self, text):
+        """Return the set of values whose keywords occur in `text`"""
+        if not self.built:
+            self.build()
+
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        found = set()
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return found
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Prefetch
+Speculative follow-up fetching while the bot is speaking and listening.
+After an answer, a bot hands the prefetcher a plan that warms its caches
+with what the user is likely to ask next (the rest of the article, the
+other pages a search also matched). Each turn's plan runs under a budget
+of fetches and seconds, and is cancelled as soon as the next turn starts
+so it never competes with a question the user is waiting on.
+"""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# "tell me more", "go on", "what else?" - asks to continue the last topic
+FOLLOW_UP_RE = re.compile(r"^\s*(?:(?:please\s+)?tell\s+me\s+more|more(?:\s+please)?|go\s+on|continue|keep\s+going|"
+                          r"what\s+else)\b[\s?.!]*(?:about\s+(?:it|that|this))?[\s?.!]*$", re.IGNORECASE)
+
+
+def is_follow_up(text):
+    """True if `text` asks to hear more about the previous answer"""
+    return bool(FOLLOW_UP_RE.match(text))
+
+
+class PrefetchTurn:
+    """One turn's share of the prefetch budget - plans call run() for every fetch"""
+
+    def __init__(self, prefetcher, generation, max_fetches, deadline):
+        self.prefetcher = prefetcher
+        self.generation = generation
+        self.max_fetches = max_fetches
+        self.deadline = deadline
+        self.fetches = 0
+
+    def active(self):
+        """False once the next turn has started or the budget is spent"""
+        return (self.prefetcher.generation == self.generation and self.fetches < self.max_fetches
+                and time.monotonic() < self.deadline)
+
+    def run(self, func, *args, **kwargs):
+        """Call func if the turn is still active; its result, or None if skipped or failed"""
+        if not self.active():
+            return None
+        self.fetches += 1
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.prefetcher.count('failed')
+            return None
+        self.prefetcher.count('fetched')
+        return result
+
+    def keep(self, value):
+        """Hand `value` to the chat loop, tagged with this turn; dropped if the turn is over"""
+        with self.prefetcher.lock:
+            if self.prefetcher.generation == self.generation:
+                self.prefetcher.last_kept = (self.generation, value)
+
+
+class Prefetcher:
+    def __init__(self, max_fetches=4, time_budget=20.0):
+        """
+        max_fetches: fetches one turn's plan may make
+        time_budget: seconds after an answer that prefetching may go on
+        """
+        self.max_fetches = max_fetches
+        self.time_budget = time_budget
+        self.generation = 0
+        self.lock = threading.Lock()
+        # (generation, value) last handed over by a plan with turn.keep()
+        self.last_kept = (None, None)
+        # One worker: a plan's fetches run in order and never pile up
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+        self.stats = {'turns': 0, 'fetched': 0, 'failed': 0, 'cancelled': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def start(self, plan, *args):
+        """
+        Cancel the previous turn's prefetch and run plan(turn, *args) in the
+        background. Returns the turn's generation, for kept()
+        """
+        with self.lock:
+            self.generation += 1
+            self.stats['turns'] += 1
+            turn = PrefetchTurn(self, self.generation, self.max_fetches, time.monotonic() + self.time_budget)
+        self.executor.submit(self._run, turn, plan, args)
+        return turn.generation
+
+    def kept(self, generation):
+        """What the plan started as `generation` kept, or None - never another turn's value"""
+        with self.lock:
+            kept_generation, value = self.last_kept
+            return value if generation is not None and kept_generation == generation else None
+
+    def cancel(self):
+        """A new turn has started - whatever is still planned is dropped"""
+        with self.lock:
+            self.generation += 1
+
+    def _run(self, turn, plan, args):
+        if not turn.active():
+            self.count('cancelled')
+            return
+        try:
+            plan(turn, *args)
+        except Exception:
+            pass
+
+    def report(self):
+        with self.lock:
+            stats = dict(self.stats)
+        return (f"Prefetch: {stats['turns']} turns, {stats['fetched']} fetches, "
+                f"{stats['failed']} failed, {stats['cancelled']} cancelled before starting")
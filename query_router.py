@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Query Router
+Cheap upfront classification of a question (weather, time, news,
+definition or general) so a bot only calls the sources that can answer that kind of
+question instead of every source deciding for itself on every turn
+"""
+
+import re
+from collections import Counter
+
+WEATHER = 'weather'
+TIME = 'time'
+NEWS = 'news'
+DEFINITION = 'definition'
+GENERAL = 'general'
+
+# First matching kind wins; anything else is a general question
+CLASSIFIERS = [
+    (WEATHER, re.compile(
+        r"\b(weather|forecast|temperature|humidity|rain(ing|y)?|snow(ing|y)?|wind(y)?|sunny|cloudy)\b"
+        r"|\bis it (hot|cold|warm)\b")),
+    (TIME, re.compile(
+        r"\bwhat time\b|\btime is it\b|\b(current|local) (time|date)\b"
+        r"|\bwhat('?s| is)? (the |today'?s )?date\b|\bwhat day is (it|today)\b|\btoday'?s date\b")),
+    (NEWS, re.compile(r"\b(news|headlines?|latest|breaking|recent)\b")),
+    (DEFINITION, re.compile(
+        r"^\s*(what|who)\s*(is|are|was|were|'s)\s"
+        r"|\b(define|definition|meaning of|stand for|stands for)\b")),
+]
+
+
+def classify(query):
+    """Return the kind of question `query` is"""
+    text = query.lower()
+    for kind, pattern in CLASSIFIERS:
+        if pattern.search(text):
+            return kind
+    return GENERAL
+
+
+class QueryRouter:
+    def __init__(self, routes):
+        """
+        routes: {question kind: [source names, best first]}; the GENERAL
+                route is used for kinds without one of their own and as
+                the fallback when a routed lookup finds nothing
+        """
+        self.routes = routes
+        self.counts = Counter()
+
+    def route(self, query):
+        """Return (kind, source names) for `query`"""
+        kind = classify(query)
+        self.counts[kind] += 1
+        return kind, self.routes.get(kind, self.routes[GENERAL])
+
+    def fallback(self, kind):
+        """General sources not already tried for a question of `kind`"""
+        tried = self.routes.get(kind, self.routes[GENERAL])
+        return [name for name in self.routes[GENERAL] if name not in tried]
+
+    def report(self):
+        return ', '.join(f"{kind}: {count}" for kind, count in self.counts.most_common())
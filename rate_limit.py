@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Rate Limit
+Per-upstream token buckets applied inside the HTTP layer. A request only
+waits when its upstream's bucket is empty - a burst of lookups within an
+upstream's allowance goes straight out - and a request that would have to
+wait longer than its own timeout fails fast with RateLimited instead.
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+DAY = 86400
+MONTH = 30 * DAY
+
+# Upstream (host or parent domain) -> (requests per second, burst size)
+UPSTREAM_LIMITS = {
+    'wikipedia.org': (5.0, 10),                     # API etiquette: keep it modest
+    'open-meteo.com': (5000 / 3600, 10),            # Free tier: 5,000 calls an hour
+    'api.duckduckgo.com': (1.0, 5),
+    'r.jina.ai': (20 / 60, 5),                      # 20 requests a minute without a key
+    'newsapi.org': (100 / DAY, 5),                  # Developer plan: 100 requests a day
+    'serpapi.com': (100 / MONTH, 3),                # Free plan: 100 searches a month
+    'google.com': (0.5, 3),                         # Result pages - stay clear of the bot check
+    'bing.microsoft.com': (3.0, 5),
+    'ask.com': (0.5, 3),
+    'answers.com': (0.5, 3),
+    'wolframalpha.com': (0.5, 3),
+}
+# The quota-based rates must add up to the plans' allowances
+assert round(UPSTREAM_LIMITS['serpapi.com'][0] * MONTH) == 100
+assert round(UPSTREAM_LIMITS['newsapi.org'][0] * DAY) == 100
+# Longest wait for a request sent without a timeout
+MAX_WAIT = 10.0
+
+
+class RateLimited(OSError):
+    """The upstream's allowance is used up for longer than the request could wait
+    (an OSError like requests' own exceptions, without importing requests here)"""
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        rate:  tokens added per second
+        burst: bucket size - requests that may go out back to back
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        """
+        Take a token and return the seconds to wait before using it, or
+        None (taking nothing) if that would be longer than `max_wait`
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self.tokens -= 1
+            return wait
+
+
+class HostRateLimiter:
+    def __init__(self, limits=None):
+        """limits: {host or parent domain: (requests per second, burst)}; other hosts are not limited"""
+        self.limits = dict(UPSTREAM_LIMITS if limits is None else limits)
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.waits = 0
+        self.waited = 0.0
+        self.refused = 0
+
+    def bucket_for(self, url):
+        """The bucket shared by `url`'s upstream, or None if it is not limited"""
+        host = (urlsplit(url).hostname or '').lower()
+        parts = host.split('.')
+        for i in range(len(parts)):
+            upstream = '.'.join(parts[i:])
+            if upstream in self.limits:
+                with self.lock:
+                    bucket = self.buckets.get(upstream)
+                    if bucket is None:
+                        bucket = self.buckets[upstream] = TokenBucket(*self.limits[upstream])
+                return bucket
+        return None
+
+    def delay(self, url, max_wait=MAX_WAIT):
+        """Seconds to hold a request to `url` back; raises RateLimited past `max_wait`"""
+        bucket = self.bucket_for(url)
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve(max_wait)
+        with self.lock:
+            if wait is None:
+                self.refused += 1
+            elif wait > 0:
+                self.waits += 1
+                self.waited += wait
+        if wait is None:
+            raise RateLimited(f"Rate limit for {urlsplit(url).hostname} reached")
+        return wait
+
+    def acquire(self, url, max_wait=MAX_WAIT):
+        """Block until a request to `url` may go out"""
+        wait = self.delay(url, max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    def report(self):
+        with self.lock:
+            return f"Rate limits: {self.waits} requests held back ({self.waited:.1f}s total), {self.refused} refused"
+
+
+def timeout_seconds(timeout):
+    """The most a request with this requests-style timeout may wait for a token"""
+    if isinstance(timeout, tuple):
+        timeout = timeout[0]
+    return MAX_WAIT if timeout is None else min(float(timeout), MAX_WAIT)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter():
+    """The process-wide limiter - every session draws on the same buckets"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HostRateLimiter()
+        return _shared
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+Bounded LRU memoization of bot answers keyed on normalized input, with a
+TTL per intent/source and hit/miss statistics
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+PUNCTUATION_RE = re.compile(r"[^\w\s']")
+
+
+def normalize(text):
+    """Canonical form of a user message: lower case, no punctuation, single spaces"""
+    return ' '.join(PUNCTUATION_RE.sub(' ', text.lower()).split())
+
+
+class ResponseCache:
+    def __init__(self, max_size=256, default_ttl=3600, ttls=None):
+        """
+        max_size:    entries kept before the least recently used is evicted
+        default_ttl: seconds an answer stays fresh when its intent has no TTL
+        ttls:        {intent or source name: seconds}; 0 means never cache
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def ttl_for(self, intent):
+        return self.ttls.get(intent, self.default_ttl)
+
+    def get(self, text):
+        """Return the cached answer for `text`, or None"""
+        key = normalize(text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, text, value, intent=None, ttl=None):
+        """Cache `value` for `text` using the TTL of `intent` unless `ttl` is given"""
+        if ttl is None:
+            ttl = self.ttl_for(intent)
+        if not ttl or ttl <= 0 or value is None:
+            return
+
+        key = normalize(text)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """Hit/miss counters as a dict"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'size': len(self.entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def report(self):
+        stats = self.stats()
+        return (f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate), {stats['size']} entries")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Singleflight
+Coalesces identical lookups that are in flight at the same time: the
+first caller for a key runs the fetch, callers arriving while it runs
+wait for it and share its result (or its exception) instead of sending
+their own request upstream. Nothing is remembered once the fetch is done
+- caching is the answer cache's job.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> _Call in flight
+        self.fetches = 0
+        self.shared = 0
+        self.impatient = 0
+
+    def do(self, key, func, *args, timeout=None, **kwargs):
+        """
+        Return (result of func(*args, **kwargs), shared). Only one call per
+        key runs at a time; `shared` is True for callers that waited on
+        another caller's fetch. The fetch's exception is raised in every
+        caller that shared it.
+
+        timeout: seconds this caller waits for another caller's fetch - it
+        is not shared, so a caller with a tighter budget than the one
+        fetching runs func itself once its own time is up
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.fetches += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            if call.done.wait(timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.value, True
+            with self.lock:
+                self.shared -= 1
+                self.fetches += 1
+                self.impatient += 1
+            return func(*args, **kwargs), False
+
+        try:
+            call.value = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self):
+        with self.lock:
+            return len(self.calls)
+
+    def report(self):
+        with self.lock:
+            total = self.fetches + self.shared
+            rate = self.shared / total if total else 0.0
+            return (f"Singleflight: {self.fetches} fetches, {self.shared} coalesced ({rate:.0%} of lookups), "
+                    f"{self.impatient} stopped waiting")
+
+
+_shared_flight = None
+_shared_lock = threading.Lock()
+
+
+def shared_flight():
+    """The process-wide group - every bot instance behind one front end coalesces together"""
+    global _shared_flight
+    with _shared_lock:
+        if _shared_flight is None:
+            _shared_flight = SingleFlight()
+        return _shared_flight
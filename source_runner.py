@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Source Runner
+Queries several answer sources concurrently on a thread pool, returns the
+first acceptable answer and records how long each source took
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Outcome of a deadline-bounded lookup; skipped lists sources cut off by the deadline
+BudgetResult = namedtuple('BudgetResult', ['source', 'answer', 'skipped'])
+
+
+def is_acceptable(answer):
+    """The bots' long-standing acceptance check for a source answer"""
+    return bool(answer) and len(answer.strip()) > 10
+
+
+class SourceLatency:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.answers = 0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def record(self, seconds, answered):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if answered:
+            self.answers += 1
+
+
+class SourceRunner:
+    def __init__(self, max_workers=8):
+        # Worker threads are reused across turns; abandoned lookups finish
+        # in the background and are bounded by their own request timeouts
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='source')
+        self.latency = {}
+        self.lock = threading.Lock()
+
+    def _timed(self, name, func, *args, **kwargs):
+        start = time.perf_counter()
+        answer = None
+        try:
+            answer = func(*args, **kwargs)
+            return answer
+        finally:
+            self.record(name, time.perf_counter() - start, answer)
+
+    def record(self, name, seconds, answer):
+        """Count one lookup of source `name` that took `seconds` and returned `answer`"""
+        with self.lock:
+            self.latency.setdefault(name, SourceLatency()).record(seconds, is_acceptable(answer))
+
+    def first_answer(self, sources, query, accept=is_acceptable, timeout=None):
+        """
+        Run every (name, func) source on `query` at once.
+        Returns (name, answer) for the first answer passing `accept`,
+        or (None, None) if none does before `timeout` seconds.
+        """
+        futures = {
+            self.executor.submit(self._timed, name, func, query): name
+            for name, func in sources
+        }
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = set(futures)
+
+        try:
+            while pending:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+
+                for future in done:
+                    try:
+                        answer = future.result()
+                    except Exception:
+                        continue
+                    if accept(answer):
+                        return futures[future], answer
+        finally:
+            # Sources still queued are dropped; ones already running are abandoned
+            for future in pending:
+                future.cancel()
+
+        return None, None
+
+    def best_within(self, sources, query, budget, hedge_after=None, accept=is_acceptable):
+        """
+        Run every (name, func) source on `query` under one deadline of
+        `budget` seconds. Sources are called as func(query, timeout=...)
+        with the timeout clamped to what is left of the budget, and any
+        source still running after `hedge_after` seconds gets a duplicate
+        request - whichever copy returns first counts. The duplicate is
+        called with coalesce=False as well, so a source that shares
+        in-flight lookups (answer_cache.cached_source) sends it upstream
+        instead of waiting on the slow first call.
+
+        The best answer is the acceptable one from the earliest source in
+        `sources`; it is returned as soon as no earlier source can still
+        beat it, or at the deadline. Returns a BudgetResult.
+        """
+        start = time.monotonic()
+        deadline = start + budget
+        hedge_at = start + hedge_after if hedge_after is not None else None
+        rank = {name: position for position, (name, _) in enumerate(sources)}
+        funcs = dict(sources)
+        futures = {}
+        pending = set()
+
+        def launch(name, hedge=False):
+            remaining = max(0.05, deadline - time.monotonic())
+            extra = {'coalesce': False} if hedge else {}
+            future = self.executor.submit(self._timed, name, funcs[name], query, timeout=remaining, **extra)
+            futures[future] = name
+            pending.add(future)
+
+        for name, _ in sources:
+            launch(name)
+
+        finished = set()
+        answers = {}
+        best = None
+        expired = False
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    expired = True
+                    break
+
+                wake_at = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, _ = wait(pending, timeout=wake_at - now, return_when=FIRST_COMPLETED)
+                pending.difference_update(done)
+
+                for future in done:
+                    name = futures[future]
+                    if name in finished:
+                        continue
+                    finished.add(name)
+                    try:
+                        answer = future.result()
+                    except Exception:
+                        answer = None
+                    if accept(answer):
+                        answers[name] = answer
+
+                if answers:
+                    best = min(answers, key=rank.get)
+                    # Nothing still running ranks above the best answer - done
+                    if all(name in finished for name in rank if rank[name] < rank[best]):
+                        break
+                if len(finished) == len(rank):
+                    break
+
+                # Hedge: one duplicate request for every source still running
+                if hedge_at is not None and time.monotonic() >= hedge_at:
+                    hedge_at = None
+                    for name in rank:
+                        if name not in finished:
+                            launch(name, hedge=True)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # Sources left behind because a better answer was already in are not skipped
+        skipped = [name for name in rank if name not in finished] if expired else []
+        return BudgetResult(best, answers.get(best), skipped)
+
+    def latency_report(self):
+        """One line per source: last and mean latency, answer count"""
+        with self.lock:
+            return [
+                f"{name}: last {stats.last:.2f}s, mean {stats.mean:.2f}s, "
+                f"{stats.answers}/{stats.count} answered"
+                for name, stats in self.latency.items()
+            ]
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Source Stats
+Exponentially weighted moving averages of each answer source's latency
+and success rate, persisted across runs, used to order a source cascade
+by expected time-to-answer
+"""
+
+import json
+import os
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_PATH = os.path.join(BASE_DIR, '.source_stats.json')
+
+
+class SourceStats:
+    # Weight of the newest observation in the moving averages
+    ALPHA = 0.2
+    # What an unseen source is assumed to cost, so new sources still get tried
+    PRIOR_LATENCY = 1.0
+    PRIOR_SUCCESS = 0.5
+    # Success rate floor so a dead source sinks to the back instead of dividing by zero
+    MIN_SUCCESS = 0.02
+    # Seconds between writes of the stats file
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, path=STATS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.sources = {}
+        self.saved_at = 0.0
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def save(self):
+        # Sources record from several threads: the lock keeps two saves from
+        # sharing the temp file or an older snapshot replacing a newer one
+        with self.lock:
+            data = json.dumps(self.sources, indent=2)
+            try:
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_path, self.path)
+                self.saved_at = time.monotonic()
+            except OSError:
+                pass
+
+    def record(self, name, seconds, success):
+        """Fold one call's latency and outcome into the source's averages"""
+        with self.lock:
+            entry = self.sources.get(name)
+            if entry is None:
+                entry = self.sources[name] = {
+                    'latency': seconds,
+                    'success': 1.0 if success else 0.0,
+                    'calls': 0,
+                }
+            else:
+                entry['latency'] += self.ALPHA * (seconds - entry['latency'])
+                entry['success'] += self.ALPHA * ((1.0 if success else 0.0) - entry['success'])
+            entry['calls'] += 1
+
+        if time.monotonic() - self.saved_at >= self.SAVE_INTERVAL:
+            self.save()
+
+    def expected_cost(self, name):
+        """Latency divided by success rate - trying sources in ascending cost
+        order minimizes the expected time until the first answer"""
+        entry = self.sources.get(name)
+        if entry is None:
+            return self.PRIOR_LATENCY / self.PRIOR_SUCCESS
+        return entry['latency'] / max(entry['success'], self.MIN_SUCCESS)
+
+    def order(self, names):
+        """Return `names` sorted by expected cost; ties keep their given order"""
+        names = list(names)
+        return sorted(names, key=lambda name: (self.expected_cost(name), names.index(name)))
+
+    def report(self):
+        with self.lock:
+            return [
+                f"{name}: {entry['latency']:.2f}s avg, {entry['success']:.0%} success, {entry['calls']} calls"
+                for name, entry in sorted(self.sources.items())
+            ]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Stale-While-Revalidate Cache
+In-process LRU cache for slow lookups. An entry past its soft TTL is
+still returned at once while a background refresh fetches a new value;
+only entries past the hard TTL (or never seen) make the caller wait,
+and concurrent callers waiting on the same key share one load.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from singleflight import SingleFlight
+
+
+class SWRCache:
+    def __init__(self, max_size=256, soft_ttl=3600, hard_ttl=86400, refresh_workers=2):
+        """
+        max_size:        entries kept before the least recently used is evicted
+        soft_ttl:        seconds after which an entry is served stale and refreshed
+        hard_ttl:        seconds after which an entry is too old to serve at all
+        refresh_workers: threads running background refreshes
+        """
+        self.max_size = max_size
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.entries = OrderedDict()  # key -> (stored_at, value)
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='swr-refresh')
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _store(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception:
+            pass  # Keep serving the stale value until it hits the hard TTL
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get(self, key, loader, timeout=None):
+        """
+        Return the value for `key`, calling loader() on a miss. Stale
+        entries are returned immediately and refreshed in the background,
+        at most one refresh per key at a time. Concurrent misses for a key
+        share a single loader() call, waited on for at most `timeout`
+        seconds before calling loader() directly. Exceptions from a
+        foreground load propagate and nothing is cached.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                age = now - stored_at
+                if age < self.soft_ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                if age < self.hard_ttl:
+                    self.entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self.refreshing:
+                        self.refreshing.add(key)
+                        self.executor.submit(self._refresh, key, loader)
+                    return value
+                del self.entries[key]
+            self.misses += 1
+
+        value, _ = self.flight.do(key, self._load, key, loader, timeout=timeout)
+        return value
+
+    def _load(self, key, loader):
+        value = loader()
+        self._store(key, value)
+        return value
+
+    def report(self):
+        with self.lock:
+            return (f"SWR cache: {self.hits} fresh hits, {self.stale_hits} stale hits, "
+                    f"{self.misses} misses, {len(self.entries)} entries")
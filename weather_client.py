@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Weather Client
+Open-Meteo geocoding and current-conditions lookups with caching: cities
+in the offline gazetteer and ones geocoded before are located without a
+request (the latter remembered on disk), and current conditions are
+cached per ~11 km grid cell for a few minutes, so a warm weather answer
+needs zero or one request instead of two
+"""
+
+import json
+import os
+import threading
+import time
+
+from gazetteer import load_gazetteer
+from http_session import shared_session
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GEOCODE_PATH = os.path.join(BASE_DIR, '.geocode_cache.json')
+
+GEOCODING_URL = 'https://geocoding-api.open-meteo.com/v1/search'
+FORECAST_URL = 'https://api.open-meteo.com/v1/forecast'
+
+# Every bot's weather answer is built from a subset of these
+CURRENT_FIELDS = 'temperature_2m,relative_humidity_2m,weather_code,wind_speed_10m,precipitation'
+
+
+class WeatherClient:
+    def __init__(self, get=None, forecast_ttl=600, grid=0.1, path=GEOCODE_PATH, gazetteer=None):
+        """
+        get:          callable with the signature of requests.get - pass one
+                      that goes through a circuit breaker to guard the upstream
+        forecast_ttl: seconds current conditions are reused for a grid cell
+        grid:         cell size in degrees for the forecast cache
+        path:         JSON file the city coordinates are kept in
+        gazetteer:    offline city index; the bundled one is loaded by default
+        """
+        self.get = get or shared_session().get
+        self.forecast_ttl = forecast_ttl
+        self.grid = grid
+        self.path = path
+        self.lock = threading.Lock()
+        self.places = self.load_places()
+        self.gazetteer = gazetteer or load_gazetteer()
+        self.unknown = set()  # Cities the geocoder had nothing for, this run only
+        self.forecasts = {}   # (lat cell, lon cell) -> (expires, current)
+
+    def load_places(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_places(self):
+        # Geocoding runs on the source threads: the lock keeps two saves from
+        # sharing the temp file or an older snapshot replacing a newer one
+        with self.lock:
+            data = json.dumps(self.places, indent=1, ensure_ascii=False)
+            try:
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_path, self.path)
+            except OSError:
+                pass
+
+    def locate(self, query, city, timeout=5):
+        """The place a weather question is about: a city the gazetteer finds
+        in the whole question, else the geocoder's match for `city`"""
+        if self.gazetteer is not None:
+            place = self.gazetteer.find(query)
+            if place is not None:
+                return place
+        return self.geocode(city, timeout=timeout)
+
+    def geocode(self, city, timeout=5):
+        """Return {'name', 'country', 'latitude', 'longitude'} for `city`, or None"""
+        key = ' '.join(city.lower().split())
+        with self.lock:
+            if key in self.places:
+                return self.places[key]
+            if key in self.unknown:
+                return None
+
+        response = self.get(GEOCODING_URL, params={'name': city, 'count': 1, 'language': 'en'}, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        results = response.json().get('results')
+        if not results:
+            with self.lock:
+                self.unknown.add(key)
+            return None
+
+        loc = results[0]
+        place = {
+            'name': loc.get('name', 'Unknown'),
+            'country': loc.get('country', ''),
+            'latitude': loc['latitude'],
+            'longitude': loc['longitude'],
+        }
+        with self.lock:
+            self.places[key] = place
+        self.save_places()
+        return place
+
+    def current(self, latitude, longitude, timeout=5):
+        """Current conditions (the Open-Meteo 'current' block) near a point, or None"""
+        cell = (round(latitude / self.grid), round(longitude / self.grid))
+        now = time.monotonic()
+        with self.lock:
+            entry = self.forecasts.get(cell)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        params = {'latitude': latitude, 'longitude': longitude, 'current': CURRENT_FIELDS}
+        response = self.get(FORECAST_URL, params=params, timeout=timeout)
+        if response.status_code != 200:
+            return None
+        current = response.json()['current']
+        with self.lock:
+            self.forecasts[cell] = (now + self.forecast_ttl, current)
+        return current
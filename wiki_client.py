@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Wiki Client
+Wikipedia lookups in a single MediaWiki API request: the search hits and
+their intro extracts come back together (generator=search, prop=extracts),
+and disambiguation pages are skipped in favour of the next hit from the
+same response instead of another round trip
+"""
+
+import re
+from collections import namedtuple
+
+from http_session import shared_session
+
+API_URL = 'https://en.wikipedia.org/w/api.php'
+
+# alternatives: titles of the other (non-disambiguation) hits, best first
+WikiPage = namedtuple('WikiPage', ['title', 'extract', 'alternatives'], defaults=[()])
+
+HEADING_RE = re.compile(r'^=+\s*(.*?)\s*=+\s*$', re.MULTILINE)
+# Sections that are lists of links rather than prose
+SKIPPED_SECTIONS = {'See also', 'References', 'Notes', 'Further reading', 'External links', 'Bibliography', 'Sources'}
+
+
+def search_params(query, limit=3, sentences=None):
+    """API parameters for the search-plus-extracts query"""
+    params = {
+        'action': 'query', 'format': 'json', 'formatversion': 2,
+        'generator': 'search', 'gsrsearch': query, 'gsrlimit': limit,
+        'prop': 'extracts|pageprops', 'ppprop': 'disambiguation',
+        'exintro': 1, 'explaintext': 1, 'exlimit': limit, 'redirects': 1,
+    }
+    if sentences:
+        params['exsentences'] = sentences
+    return params
+
+
+def best_page(data):
+    """The highest-ranked hit that is not a disambiguation page, or None"""
+    pages = (data.get('query') or {}).get('pages') or []
+    # Generator results come back in page-id order; 'index' is the search rank
+    hits = [
+        page for page in sorted(pages, key=lambda page: page.get('index', 0))
+        if 'disambiguation' not in (page.get('pageprops') or {}) and page.get('extract')
+    ]
+    if not hits:
+        return None
+    return WikiPage(hits[0]['title'], hits[0]['extract'], tuple(page['title'] for page in hits[1:]))
+
+
+def article_params(title):
+    """API parameters for a whole article as plain text with == headings =="""
+    return {
+        'action': 'query', 'format': 'json', 'formatversion': 2, 'titles': title,
+        'prop': 'extracts', 'explaintext': 1, 'exsectionformat': 'wiki', 'redirects': 1,
+    }
+
+
+def remaining_sections(text):
+    """The prose of an article after its introduction, headings dropped"""
+    parts = HEADING_RE.split(text)
+    # parts: [intro, heading, body, heading, body, ...]
+    bodies = [body.strip() for heading, body in zip(parts[1::2], parts[2::2])
+              if heading not in SKIPPED_SECTIONS and body.strip()]
+    return '\n\n'.join(bodies) or None
+
+
+def next_passage(text, start=0, limit=1000):
+    """(paragraphs of `text` from paragraph `start` up to about `limit` characters, next start)"""
+    paragraphs = text.split('\n\n')[start:]
+    passage = []
+    length = 0
+    for paragraph in paragraphs:
+        if passage and length + len(paragraph) > limit:
+            break
+        passage.append(paragraph)
+        length += len(paragraph)
+    return '\n\n'.join(passage), start + len(passage)
+
+
+class WikiClient:
+    def __init__(self, session=None, api_url=API_URL):
+        self.session = session or shared_session()
+        self.api_url = api_url
+
+    def lookup(self, query, sentences=None, timeout=5, limit=3):
+        """
+        Return the WikiPage best matching `query`, or None if nothing
+        matches. Raises on network errors and HTTP error statuses.
+        """
+        response = self.session.get(self.api_url, params=search_params(query, limit, sentences), timeout=timeout)
+        response.raise_for_status()
+        return best_page(response.json())
+
+    def more(self, title, timeout=5):
+        """The article `title` past its introduction, or None"""
+        response = self.session.get(self.api_url, params=article_params(title), timeout=timeout)
+        response.raise_for_status()
+        pages = (response.json().get('query') or {}).get('pages') or []
+        if not pages or not pages[0].get('extract'):
+            return None
+        return remaining_sections(pages[0]['extract'])